@@ -0,0 +1,70 @@
+"""
+================================================================================
+CACHE MODULE - Memoisasi Query Statistik Lintas Rerun
+================================================================================
+Modul ini membungkus query statistik database.py dengan st.cache_data
+agar rerun Streamlit (ganti bulan, klik tombol, pindah tab) tidak
+mengeksekusi ulang SQL yang hasilnya belum berubah.
+
+Setiap wrapper menerima token versi dari db.get_data_version() sebagai
+bagian dari key cache: mutasi data mengubah token sehingga cache lama
+otomatis terlewati, tanpa perlu invalidasi manual dari halaman lain.
+================================================================================
+Mata Kuliah: Teknik Pemrograman
+Program Studi: Teknik Geofisika - Semester 5
+================================================================================
+"""
+
+from typing import Dict, List, Tuple
+
+import streamlit as st
+
+import database as db
+
+
+@st.cache_data(ttl=60)
+def get_analysis_bundle(version: Tuple) -> Dict:
+    """
+    Versi ter-cache dari db.get_analysis_bundle.
+
+    Satu entry cache menampung semua irisan data halaman
+    Analisis/Dashboard (overall, project_stats, category_dist,
+    durations, active_months).
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+
+    Returns:
+        Dict: Bundle data analisis (lihat db.get_analysis_bundle)
+    """
+    return db.get_analysis_bundle()
+
+
+@st.cache_data(ttl=60)
+def get_daily_hours_for_month(version: Tuple, month: str) -> List[Dict]:
+    """
+    Versi ter-cache dari db.get_daily_hours_for_month.
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+        month: Bulan dalam format YYYY-MM
+
+    Returns:
+        List[Dict]: Jam per hari (lihat db.get_daily_hours_for_month)
+    """
+    return db.get_daily_hours_for_month(month)
+
+
+@st.cache_data(ttl=60)
+def get_month_summary(version: Tuple, month: str) -> Dict:
+    """
+    Versi ter-cache dari db.get_month_summary.
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+        month: Bulan dalam format YYYY-MM
+
+    Returns:
+        Dict: Ringkasan bulan (lihat db.get_month_summary)
+    """
+    return db.get_month_summary(month)
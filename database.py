@@ -12,47 +12,103 @@ Program Studi: Teknik Geofisika - Semester 5
 """
 
 import sqlite3
+import threading
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
 from contextlib import contextmanager
 
+import numpy as np
+
 from constants import DATABASE_FILE, DEFAULT_SETTINGS, ERROR_MESSAGES
 
 
 # ==================== DATABASE CONNECTION ====================
 
+# Satu koneksi per thread, dipakai ulang lintas pemanggilan. Streamlit
+# menjalankan ulang script pada thread yang sama per session, sehingga
+# statement cache bawaan sqlite3 (prepared statements) ikut terpakai
+# ulang antar rerun tanpa parsing SQL berulang.
+_local = threading.local()
+
+
+def _thread_connection() -> sqlite3.Connection:
+    """
+    Mengambil (atau membuat) koneksi milik thread saat ini.
+
+    Returns:
+        sqlite3.Connection: Koneksi yang dipakai ulang untuk thread ini
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(
+            DATABASE_FILE,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row  # Akses kolom dengan nama
+        # WAL: pembaca tidak memblokir penulis, dan commit cukup
+        # fsync ke log WAL. synchronous=NORMAL aman dipadukan dengan
+        # WAL (database tidak bisa korup; paling buruk commit terakhir
+        # hilang saat mati listrik) dan menghapus fsync per-commit.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    return conn
+
+
 @contextmanager
 def get_connection():
     """
     Context manager untuk koneksi database yang aman.
-    
+
     Fungsi ini memastikan:
-    - Koneksi ditutup dengan benar setelah selesai
+    - Koneksi dipakai ulang per thread (tidak dibuka/ditutup per query)
     - Transaction di-commit jika sukses
     - Transaction di-rollback jika terjadi error
-    
+    - Kolom TIMESTAMP dikembalikan sebagai objek datetime
+      (PARSE_DECLTYPES), tanpa parsing manual di layer atas
+
     Yields:
         sqlite3.Connection: Objek koneksi database
-    
+
     Raises:
         Exception: Meneruskan exception apapun yang terjadi
-    
+
     Examples:
         >>> with get_connection() as conn:
         ...     cursor = conn.cursor()
         ...     cursor.execute("SELECT * FROM projects")
         ...     results = cursor.fetchall()
     """
-    conn = sqlite3.connect(DATABASE_FILE)
-    conn.row_factory = sqlite3.Row  # Akses kolom dengan nama
+    conn = _thread_connection()
     try:
         yield conn
         conn.commit()
     except Exception as e:
         conn.rollback()
         raise e
-    finally:
-        conn.close()
+
+
+# Ukuran potongan default untuk streaming baris export
+EXPORT_CHUNK_ROWS = 10_000
+
+
+def _fetch_chunks(cursor: sqlite3.Cursor, chunk_size: int) -> Iterator:
+    """
+    Menghasilkan baris cursor per potongan chunk_size.
+
+    Args:
+        cursor: Cursor yang sudah mengeksekusi query
+        chunk_size: Jumlah baris per potongan
+
+    Yields:
+        List: Potongan baris hasil fetchmany
+    """
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
 
 
 def init_database():
@@ -100,10 +156,24 @@ def init_database():
                 duration_hours REAL,
                 notes TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
             )
         """)
         
+        # Migrasi database lama: tambahkan kolom updated_at bila belum
+        # ada (ALTER tidak mendukung default CURRENT_TIMESTAMP, jadi
+        # nilai awal diisi dari created_at)
+        cursor.execute("PRAGMA table_info(activities)")
+        activity_columns = {row['name'] for row in cursor.fetchall()}
+        if 'updated_at' not in activity_columns:
+            cursor.execute(
+                "ALTER TABLE activities ADD COLUMN updated_at TIMESTAMP"
+            )
+            cursor.execute(
+                "UPDATE activities SET updated_at = created_at"
+            )
+        
         # ==================== TABEL SETTINGS ====================
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS settings (
@@ -206,6 +276,42 @@ def get_all_projects() -> List[Dict]:
         return [dict(row) for row in cursor.fetchall()]
 
 
+def has_projects() -> bool:
+    """
+    Mengecek apakah ada minimal satu proyek.
+
+    Returns:
+        bool: True jika tabel projects tidak kosong
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM projects)")
+        return bool(cursor.fetchone()[0])
+
+
+def get_projects_export(
+        chunk_size: int = EXPORT_CHUNK_ROWS) -> Tuple[List[str], Iterator]:
+    """
+    Mendapatkan kolom dan baris mentah proyek untuk export CSV.
+
+    Args:
+        chunk_size: Jumlah baris per potongan
+
+    Returns:
+        Tuple[List[str], Iterator]: (nama kolom, iterator list baris)
+    """
+    cursor = _thread_connection().execute("""
+        SELECT p.*, 
+               COALESCE(SUM(a.duration_hours), 0) as total_logged_hours
+        FROM projects p
+        LEFT JOIN activities a ON p.id = a.project_id
+        GROUP BY p.id
+        ORDER BY p.created_at DESC
+    """)
+    columns = [description[0] for description in cursor.description]
+    return columns, _fetch_chunks(cursor, chunk_size)
+
+
 def get_active_projects() -> List[Dict]:
     """
     Mendapatkan proyek yang berstatus aktif saja.
@@ -386,6 +492,40 @@ def create_activity(project_id: int, start_time: datetime,
         return cursor.lastrowid
 
 
+def create_activities(rows: Iterable[Tuple]) -> int:
+    """
+    Membuat banyak catatan aktivitas sekaligus (bulk insert).
+
+    Seluruh baris dieksekusi dengan satu prepared statement di dalam
+    satu transaksi, jauh lebih cepat daripada memanggil create_activity
+    berulang kali (mis. saat mengisi sample data).
+
+    Args:
+        rows: Iterable tuple dengan urutan kolom
+              (project_id, start_time, end_time, duration_hours, notes).
+              Validasi rentang waktu dilakukan di sisi pemanggil;
+              fungsi ini tidak memeriksa ulang tiap baris.
+
+    Returns:
+        int: Jumlah aktivitas yang dibuat
+
+    Examples:
+        >>> rows = [
+        ...     (1, datetime(2024, 12, 15, 9, 0),
+        ...      datetime(2024, 12, 15, 12, 0), 3.0, "QC data seismik")
+        ... ]
+        >>> create_activities(rows)
+        1
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO activities (project_id, start_time, end_time, duration_hours, notes)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        return cursor.rowcount
+
+
 def get_all_activities() -> List[Dict]:
     """
     Mendapatkan semua aktivitas beserta info proyek terkait.
@@ -409,6 +549,48 @@ def get_all_activities() -> List[Dict]:
         return [dict(row) for row in cursor.fetchall()]
 
 
+def has_activities() -> bool:
+    """
+    Mengecek apakah ada minimal satu aktivitas.
+
+    EXISTS berhenti pada baris pertama; jauh lebih murah daripada
+    memuat seluruh tabel hanya untuk cek kosong/tidak.
+
+    Returns:
+        bool: True jika tabel activities tidak kosong
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM activities)")
+        return bool(cursor.fetchone()[0])
+
+
+def get_activities_export(
+        chunk_size: int = EXPORT_CHUNK_ROWS) -> Tuple[List[str], Iterator]:
+    """
+    Mendapatkan kolom dan baris mentah aktivitas untuk export CSV.
+
+    Baris di-stream per potongan chunk_size lewat fetchmany, sehingga
+    memori puncak tidak tumbuh sebesar seluruh tabel; tiap baris
+    berupa sequence yang siap ditulis csv.writer tanpa konversi ke
+    dictionary.
+
+    Args:
+        chunk_size: Jumlah baris per potongan
+
+    Returns:
+        Tuple[List[str], Iterator]: (nama kolom, iterator list baris)
+    """
+    cursor = _thread_connection().execute("""
+        SELECT a.*, p.name as project_name, p.category as project_category
+        FROM activities a
+        JOIN projects p ON a.project_id = p.id
+        ORDER BY a.start_time DESC
+    """)
+    columns = [description[0] for description in cursor.description]
+    return columns, _fetch_chunks(cursor, chunk_size)
+
+
 def get_activities_by_project(project_id: int) -> List[Dict]:
     """
     Mendapatkan aktivitas berdasarkan proyek tertentu.
@@ -431,6 +613,81 @@ def get_activities_by_project(project_id: int) -> List[Dict]:
         return [dict(row) for row in cursor.fetchall()]
 
 
+def get_activities_by_range(start_time: datetime, end_time: datetime,
+                            project_id: Optional[int] = None) -> List[Dict]:
+    """
+    Mendapatkan aktivitas dengan waktu mulai pada rentang tertentu.
+
+    Filter tanggal dieksekusi di SQL (memanfaatkan index
+    idx_activities_start), sehingga hanya baris dalam rentang yang
+    dikirim ke aplikasi.
+
+    Args:
+        start_time: Batas bawah waktu mulai (inklusif)
+        end_time: Batas atas waktu mulai (inklusif)
+        project_id: Jika diisi, batasi ke proyek tersebut saja
+
+    Returns:
+        List[Dict]: List aktivitas dengan info proyek terkait,
+                    diurutkan berdasarkan waktu mulai (terbaru dulu)
+    """
+    query = """
+        SELECT a.*, p.name as project_name, p.category as project_category
+        FROM activities a
+        JOIN projects p ON a.project_id = p.id
+        WHERE a.start_time BETWEEN ? AND ?
+    """
+    params: List[Any] = [start_time, end_time]
+
+    if project_id is not None:
+        query += " AND a.project_id = ?"
+        params.append(project_id)
+
+    query += " ORDER BY a.start_time DESC"
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def get_activity_summary(start_time: datetime, end_time: datetime,
+                         project_id: Optional[int] = None) -> Tuple[int, float]:
+    """
+    Mendapatkan ringkasan agregat aktivitas pada rentang tertentu.
+
+    Reduksi (COUNT + SUM) dikerjakan langsung oleh SQLite, sehingga
+    ringkasan bisa ditampilkan tanpa memindahkan satu baris aktivitas
+    pun ke aplikasi.
+
+    Args:
+        start_time: Batas bawah waktu mulai (inklusif)
+        end_time: Batas atas waktu mulai (inklusif)
+        project_id: Jika diisi, batasi ke proyek tersebut saja
+
+    Returns:
+        Tuple[int, float]: (jumlah aktivitas, total duration_hours);
+                           aktivitas ongoing dihitung tetapi durasinya 0
+    """
+    query = """
+        SELECT COUNT(*) AS activity_count,
+               COALESCE(SUM(duration_hours), 0) AS total_hours
+        FROM activities
+        WHERE start_time BETWEEN ? AND ?
+    """
+    params: List[Any] = [start_time, end_time]
+
+    if project_id is not None:
+        query += " AND project_id = ?"
+        params.append(project_id)
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+        return row['activity_count'], row['total_hours']
+
+
 def get_ongoing_activities() -> List[Dict]:
     """
     Mendapatkan aktivitas yang sedang berjalan (belum selesai).
@@ -512,8 +769,8 @@ def end_activity(activity_id: int, end_time: datetime) -> bool:
         if row['end_time'] is not None:
             raise ValueError(ERROR_MESSAGES["activity_already_ended"])
         
-        # Validasi waktu
-        start_time = datetime.fromisoformat(row['start_time'])
+        # Validasi waktu (start_time sudah berupa datetime dari koneksi)
+        start_time = row['start_time']
         if end_time <= start_time:
             raise ValueError(ERROR_MESSAGES["end_time_before_start"])
         
@@ -523,7 +780,7 @@ def end_activity(activity_id: int, end_time: datetime) -> bool:
         # Update aktivitas
         cursor.execute("""
             UPDATE activities 
-            SET end_time = ?, duration_hours = ?
+            SET end_time = ?, duration_hours = ?, updated_at = CURRENT_TIMESTAMP
             WHERE id = ? AND end_time IS NULL
         """, (end_time, duration, activity_id))
         
@@ -560,7 +817,7 @@ def update_activity(activity_id: int, project_id: int, start_time: datetime,
         cursor.execute("""
             UPDATE activities 
             SET project_id = ?, start_time = ?, end_time = ?, 
-                duration_hours = ?, notes = ?
+                duration_hours = ?, notes = ?, updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
         """, (project_id, start_time, end_time, duration, notes, activity_id))
         return cursor.rowcount > 0
@@ -617,6 +874,80 @@ def get_daily_hours(days: int = 30) -> List[Dict]:
         return [dict(row) for row in cursor.fetchall()]
 
 
+def get_active_months() -> List[str]:
+    """
+    Mendapatkan daftar bulan yang memiliki aktivitas.
+
+    Berguna untuk mengisi selectbox filter bulan tanpa menarik
+    seluruh tabel aktivitas.
+
+    Returns:
+        List[str]: Bulan dalam format YYYY-MM, terbaru dulu
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT DISTINCT strftime('%Y-%m', start_time) as month
+            FROM activities
+            ORDER BY month DESC
+        """)
+        return [row['month'] for row in cursor.fetchall()]
+
+
+def get_daily_hours_for_month(month: str) -> List[Dict]:
+    """
+    Mendapatkan total jam kerja per hari untuk satu bulan tertentu.
+
+    Agregasi GROUP BY dikerjakan SQLite, sehingga hanya baris
+    per-hari (maksimal 31) yang dikirim ke aplikasi — bukan seluruh
+    tabel aktivitas.
+
+    Args:
+        month: Bulan dalam format YYYY-MM
+
+    Returns:
+        List[Dict]: List dengan field:
+            - date: Tanggal (format YYYY-MM-DD)
+            - total_hours: Total jam pada tanggal tersebut
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT DATE(start_time) as date,
+                   COALESCE(SUM(duration_hours), 0) as total_hours
+            FROM activities
+            WHERE strftime('%Y-%m', start_time) = ?
+            GROUP BY DATE(start_time)
+            ORDER BY date
+        """, (month,))
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def get_month_summary(month: str) -> Dict:
+    """
+    Mendapatkan ringkasan agregat aktivitas untuk satu bulan.
+
+    Args:
+        month: Bulan dalam format YYYY-MM
+
+    Returns:
+        Dict: Dictionary dengan field:
+            - total_hours: Total jam pada bulan tersebut
+            - days_active: Jumlah hari dengan aktivitas
+            - total_activities: Jumlah aktivitas
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COALESCE(SUM(duration_hours), 0) as total_hours,
+                   COUNT(DISTINCT DATE(start_time)) as days_active,
+                   COUNT(*) as total_activities
+            FROM activities
+            WHERE strftime('%Y-%m', start_time) = ?
+        """, (month,))
+        return dict(cursor.fetchone())
+
+
 def get_category_distribution() -> List[Dict]:
     """
     Mendapatkan distribusi waktu kerja per kategori proyek.
@@ -735,24 +1066,88 @@ def get_overall_statistics() -> Dict:
         }
 
 
-def get_duration_array() -> List[float]:
+def get_duration_array() -> np.ndarray:
     """
     Mendapatkan array durasi aktivitas untuk analisis statistik.
     
-    Fungsi ini mengembalikan list semua durasi aktivitas yang sudah
-    selesai, berguna untuk perhitungan statistik dengan NumPy/SciPy.
+    Fungsi ini mengembalikan array float64 semua durasi aktivitas yang
+    sudah selesai, siap pakai untuk perhitungan statistik NumPy. Hasil
+    fetch dialirkan langsung ke buffer berukuran pasti lewat
+    np.fromiter, tanpa list Python perantara.
     
     Returns:
-        List[float]: List nilai durasi dalam jam, diurutkan ascending
+        np.ndarray: Nilai durasi dalam jam, diurutkan ascending
     """
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM activities
+            WHERE duration_hours IS NOT NULL AND duration_hours > 0
+        """)
+        count = cursor.fetchone()[0]
+
         cursor.execute("""
             SELECT duration_hours FROM activities 
             WHERE duration_hours IS NOT NULL AND duration_hours > 0
             ORDER BY duration_hours
         """)
-        return [row['duration_hours'] for row in cursor.fetchall()]
+        return np.fromiter(
+            (row[0] for row in cursor), dtype=np.float64, count=count
+        )
+
+
+def get_analysis_bundle() -> Dict:
+    """
+    Mengambil semua irisan data halaman Analisis/Dashboard sekaligus.
+
+    Kelima query berjalan berurutan pada koneksi thread yang sama,
+    sehingga satu pemanggilan ini menggantikan lima round-trip terpisah
+    dari layer view dan memanfaatkan page cache SQLite yang masih hangat.
+
+    Returns:
+        Dict: Dictionary dengan key:
+            - overall: statistik keseluruhan (get_overall_statistics)
+            - project_stats: statistik per proyek (get_project_statistics)
+            - category_dist: distribusi kategori (get_category_distribution)
+            - durations: array durasi (get_duration_array)
+            - active_months: bulan aktif (get_active_months)
+    """
+    return {
+        'overall': get_overall_statistics(),
+        'project_stats': get_project_statistics(),
+        'category_dist': get_category_distribution(),
+        'durations': get_duration_array(),
+        'active_months': get_active_months(),
+    }
+
+
+def get_data_version() -> Tuple:
+    """
+    Mendapatkan token versi data yang murah dihitung.
+
+    Token berubah setiap kali proyek atau aktivitas dimutasi, sehingga
+    cocok dipakai sebagai key cache: selama token sama, hasil query
+    statistik yang di-cache masih valid.
+
+    Returns:
+        Tuple: Kombinasi count/max/total dari kedua tabel utama
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM projects) AS project_count,
+                (SELECT COALESCE(MAX(updated_at), '') FROM projects)
+                    AS project_version,
+                (SELECT COUNT(*) FROM activities) AS activity_count,
+                (SELECT COALESCE(MAX(created_at), '') FROM activities)
+                    AS activity_created,
+                (SELECT COALESCE(MAX(updated_at), '') FROM activities)
+                    AS activity_updated,
+                (SELECT TOTAL(duration_hours) FROM activities)
+                    AS total_duration
+        """)
+        return tuple(cursor.fetchone())
 
 
 # ==================== SETTINGS OPERATIONS ====================
@@ -774,6 +1169,36 @@ def get_setting(key: str) -> Optional[str]:
         return row['value'] if row else None
 
 
+def reset_all():
+    """
+    Mengosongkan seluruh data dalam satu transaksi DELETE.
+
+    Koneksi dan file database tetap dipakai; tidak ada unlink file
+    plus pembuatan ulang skema seperti pada hapus-file-lalu-init.
+    Setelah DELETE, settings diisi ulang dengan nilai default dan
+    VACUUM mengembalikan ruang file ke sistem.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM activities")
+        cursor.execute("DELETE FROM projects")
+        cursor.execute("DELETE FROM settings")
+        # Reset counter AUTOINCREMENT agar id mulai dari 1 lagi,
+        # sama seperti perilaku database baru
+        cursor.execute("DELETE FROM sqlite_sequence")
+        cursor.execute("""
+            INSERT INTO settings (key, value) VALUES 
+            ('target_hours_per_day', ?),
+            ('efficiency_threshold', ?)
+        """, (
+            str(DEFAULT_SETTINGS['target_hours_per_day']),
+            str(DEFAULT_SETTINGS['efficiency_threshold'])
+        ))
+
+    # VACUUM harus di luar transaksi; dijalankan setelah COMMIT
+    _thread_connection().execute("VACUUM")
+
+
 def set_setting(key: str, value: str) -> bool:
     """
     Menyimpan atau memperbarui nilai pengaturan.
@@ -793,6 +1218,30 @@ def set_setting(key: str, value: str) -> bool:
         return cursor.rowcount > 0
 
 
+def set_settings_bulk(settings: Dict[str, str]) -> bool:
+    """
+    Menyimpan beberapa pengaturan sekaligus dalam satu transaksi.
+
+    Satu BEGIN/COMMIT (dan satu fsync) diamortisasi untuk semua key,
+    alih-alih satu transaksi per pemanggilan set_setting.
+
+    Args:
+        settings: Dictionary key-value pengaturan yang akan disimpan
+
+    Returns:
+        bool: True jika berhasil
+    """
+    if not settings:
+        return True
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)
+        """, list(settings.items()))
+        return cursor.rowcount > 0
+
+
 def get_all_settings() -> Dict[str, str]:
     """
     Mendapatkan semua pengaturan.
@@ -14,78 +14,93 @@ Program Studi: Teknik Geofisika - Semester 5
 ================================================================================
 """
 
-import random
 from datetime import datetime, timedelta
+from typing import NamedTuple
+
+import numpy as np
 
 import database as db
 
 
+# ==================== KONFIGURASI GENERATOR ====================
+RANDOM_SEED = 20240101
+"""Seed RNG agar sample data reproducible antar run (dan antar mesin)."""
+
 # ==================== DATA CONTOH PROYEK ====================
-SAMPLE_PROJECTS = [
-    {
-        "name": "Pengolahan Data Seismik Laut Jawa",
-        "description": (
+
+class SampleProject(NamedTuple):
+    """Satu proyek contoh; akses atribut lewat slot, tanpa dict hashing."""
+    name: str
+    description: str
+    estimated_hours: float
+    category: str
+
+
+SAMPLE_PROJECTS = (
+    SampleProject(
+        name="Pengolahan Data Seismik Laut Jawa",
+        description=(
             "Pemrosesan dan interpretasi data seismik 2D untuk "
             "identifikasi struktur bawah permukaan di Laut Jawa bagian utara. "
             "Meliputi filtering, migrasi, dan picking horizon."
         ),
-        "estimated_hours": 45.0,
-        "category": "Pengolahan Data Seismik"
-    },
-    {
-        "name": "Survey Gravity Daerah Panas Bumi Kamojang",
-        "description": (
+        estimated_hours=45.0,
+        category="Pengolahan Data Seismik"
+    ),
+    SampleProject(
+        name="Survey Gravity Daerah Panas Bumi Kamojang",
+        description=(
             "Pengukuran dan interpretasi data gravity untuk eksplorasi "
             "panas bumi di daerah Kamojang, Jawa Barat. Termasuk koreksi "
             "terrain dan pembuatan peta anomali Bouguer."
         ),
-        "estimated_hours": 30.0,
-        "category": "Interpretasi Data Gravity"
-    },
-    {
-        "name": "Pemodelan Resistivitas Akuifer Bandung",
-        "description": (
+        estimated_hours=30.0,
+        category="Interpretasi Data Gravity"
+    ),
+    SampleProject(
+        name="Pemodelan Resistivitas Akuifer Bandung",
+        description=(
             "Pemodelan 2D data resistivitas untuk pemetaan akuifer "
             "di cekungan Bandung menggunakan metode inversi. "
             "Bertujuan untuk identifikasi zona potensi air tanah."
         ),
-        "estimated_hours": 25.0,
-        "category": "Pemodelan Resistivitas"
-    },
-    {
-        "name": "Analisis Well Log Sumur Eksplorasi X-1",
-        "description": (
+        estimated_hours=25.0,
+        category="Pemodelan Resistivitas"
+    ),
+    SampleProject(
+        name="Analisis Well Log Sumur Eksplorasi X-1",
+        description=(
             "Interpretasi well log untuk karakterisasi reservoir "
             "dan identifikasi zona prospek hidrokarbon. Meliputi "
             "analisis GR, SP, resistivitas, dan neutron-density."
         ),
-        "estimated_hours": 35.0,
-        "category": "Analisis Well Log"
-    },
-    {
-        "name": "Laporan Tugas Akhir - Bab 3 Metodologi",
-        "description": (
+        estimated_hours=35.0,
+        category="Analisis Well Log"
+    ),
+    SampleProject(
+        name="Laporan Tugas Akhir - Bab 3 Metodologi",
+        description=(
             "Penulisan bab metodologi penelitian tugas akhir "
             "tentang aplikasi metode seismik refraksi untuk "
             "penentuan kedalaman batuan dasar."
         ),
-        "estimated_hours": 20.0,
-        "category": "Penulisan Laporan"
-    },
-    {
-        "name": "Praktikum Geolistrik Lapangan",
-        "description": (
+        estimated_hours=20.0,
+        category="Penulisan Laporan"
+    ),
+    SampleProject(
+        name="Praktikum Geolistrik Lapangan",
+        description=(
             "Pengukuran geolistrik metode Schlumberger di lokasi "
             "praktikum kampus. Meliputi pengambilan data, input, "
             "dan interpretasi kurva sounding."
         ),
-        "estimated_hours": 15.0,
-        "category": "Pengukuran Lapangan"
-    }
-]
+        estimated_hours=15.0,
+        category="Pengukuran Lapangan"
+    )
+)
 
 # ==================== CATATAN AKTIVITAS CONTOH ====================
-SAMPLE_NOTES = [
+SAMPLE_NOTES = (
     "Quality control data mentah",
     "Preprocessing dan filtering noise",
     "Picking horizon reflector utama",
@@ -106,7 +121,7 @@ SAMPLE_NOTES = [
     "Input data ke software pengolahan",
     "Pembuatan cross-section interpretasi",
     "Korelasi antar sumur eksplorasi"
-]
+)
 
 
 def generate_sample_data():
@@ -116,7 +131,7 @@ def generate_sample_data():
     Fungsi ini akan:
     1. Menginisialisasi ulang database
     2. Membuat 6 proyek contoh dengan kategori berbeda
-    3. Membuat aktivitas random selama 31 hari terakhir
+    3. Membuat aktivitas acak (seed tetap) selama 31 hari terakhir
     4. Menambahkan 1 aktivitas ongoing
     """
     print("=" * 60)
@@ -155,101 +170,129 @@ def _generate_projects() -> list:
     for index, project_info in enumerate(SAMPLE_PROJECTS):
         # Buat proyek
         project_id = db.create_project(
-            project_info["name"],
-            project_info["description"],
-            project_info["estimated_hours"],
-            project_info["category"]
+            project_info.name,
+            project_info.description,
+            project_info.estimated_hours,
+            project_info.category
         )
         project_ids.append(project_id)
-        
+
         # Update status untuk variasi
         if index == 3:  # Proyek ke-4 selesai
             db.update_project_status(project_id, "completed")
         elif index == 5:  # Proyek ke-6 ditunda
             db.update_project_status(project_id, "paused")
-        
+
         # Tampilkan progress
         status_icon = "✓" if index not in [3, 5] else "○"
-        print(f"   {status_icon} {project_info['name'][:45]}...")
+        print(f"   {status_icon} {project_info.name[:45]}...")
     
     return project_ids
 
 
 def _generate_activities(project_ids: list) -> int:
     """
-    Generate aktivitas-aktivitas contoh.
-    
+    Generate aktivitas-aktivitas contoh secara vektorisasi dengan NumPy.
+
+    Seluruh atribut aktivitas (hari, proyek, jam mulai, durasi) digambar
+    sekaligus sebagai array NumPy, sehingga tidak ada pemanggilan random
+    per-baris di dalam loop Python.
+
     Args:
         project_ids: Daftar ID proyek yang tersedia
-    
+
     Returns:
         int: Jumlah aktivitas yang dibuat
     """
     print("\n⏱️  Membuat aktivitas...")
-    
+
+    # Generator ter-seed: run berulang menghasilkan data yang sama persis
+    rng = np.random.default_rng(RANDOM_SEED)
+    num_days = 31
     start_date = datetime.now() - timedelta(days=30)
-    activity_count = 0
-    
-    # Generate aktivitas untuk 31 hari
-    for day_offset in range(31):
-        current_date = start_date + timedelta(days=day_offset)
-        
-        # Skip weekend dengan probabilitas 70%
-        if current_date.weekday() >= 5 and random.random() > 0.3:
-            continue
-        
-        # 1-4 aktivitas per hari
-        num_activities = random.randint(1, 4)
-        day_start_hour = 8
-        
-        for _ in range(num_activities):
-            # Pilih proyek (proyek awal lebih sering)
-            weights = [3, 3, 2, 2, 1, 1]
-            project_index = random.choices(
-                range(len(project_ids)), 
-                weights=weights[:len(project_ids)]
-            )[0]
-            project_id = project_ids[project_index]
-            
-            # Generate waktu
-            start_hour = day_start_hour + random.randint(0, 2)
-            start_minute = random.randint(0, 59)
-            duration_hours = round(random.uniform(0.5, 4.0), 1)
-            
-            # Buat datetime
-            start_time = current_date.replace(
-                hour=min(start_hour, 17),
-                minute=start_minute,
-                second=0,
-                microsecond=0
-            )
-            end_time = start_time + timedelta(hours=duration_hours)
-            
-            # Buat aktivitas
-            try:
-                db.create_activity(
-                    project_id,
-                    start_time,
-                    end_time,
-                    random.choice(SAMPLE_NOTES)
-                )
-                activity_count += 1
-            except ValueError:
-                # Skip jika validasi gagal
-                pass
-            
-            # Update jam mulai berikutnya
-            day_start_hour = end_time.hour + 1
-            
-            # Jangan lebih dari jam 6 sore
-            if day_start_hour >= 18:
-                break
-    
+
+    # Tentukan hari yang dipakai: weekend dilewati dengan probabilitas 70%
+    day_offsets = np.arange(num_days)
+    weekdays = (start_date.weekday() + day_offsets) % 7
+    keep_day = (weekdays < 5) | (rng.random(num_days) <= 0.3)
+
+    # 1-4 aktivitas per hari (0 untuk hari yang dilewati)
+    counts = rng.integers(1, 5, size=num_days) * keep_day
+
+    # Ekspansi: satu baris per aktivitas
+    day_index = np.repeat(day_offsets, counts)
+    total = day_index.size
+
+    # Pilih proyek dengan bobot (proyek awal lebih sering)
+    weights = np.array([3, 3, 2, 2, 1, 1][:len(project_ids)], dtype=float)
+    project_index = rng.choice(
+        len(project_ids), size=total, p=weights / weights.sum()
+    )
+
+    # Durasi dan variasi jam mulai. Jitter jam digambar per HARI
+    # (seperti 8 + randint(0, 2) pada versi loop): jitter per aktivitas
+    # akan menggeser awal aktivitas lanjutan dan bisa membuatnya
+    # tumpang-tindih dengan aktivitas sebelumnya.
+    durations = np.round(rng.uniform(0.5, 4.0, size=total), 1)
+    day_start_hours = 8 + rng.integers(0, 3, size=num_days)
+    start_minutes = rng.integers(0, 60, size=total)
+
+    # Jam mulai kumulatif per hari: aktivitas berikutnya dimulai
+    # setelah aktivitas sebelumnya selesai (+1 jam jeda). Kumulatif
+    # dipakai eksak (tanpa floor) sehingga selisih menit acak
+    # (maksimal 59) tidak pernah melampaui jeda 1 jam tersebut.
+    day_firsts = np.cumsum(counts) - counts
+    offsets = np.concatenate(([0.0], durations[:-1] + 1.0))[:total]
+    offsets[day_firsts[counts > 0]] = 0.0
+    cumulative = np.cumsum(offsets)
+    cumulative -= np.repeat(cumulative[day_firsts[counts > 0]], counts[counts > 0])
+    start_seconds = (
+        day_start_hours[day_index] * 3600
+        + np.round(cumulative * 3600).astype(np.int64)
+        + start_minutes * 60
+    )
+
+    # Jangan lebih dari jam 6 sore
+    mask = start_seconds < 18 * 3600
+
+    # Hitung waktu mulai/selesai dengan aritmetika datetime64.
+    # Basis tengah-malam dihitung sekali per hari (31 nilai) lalu
+    # di-index per aktivitas, bukan dikonstruksi ulang per baris.
+    base_day = np.datetime64(start_date.date())
+    day_bases = (
+        base_day + day_offsets.astype('timedelta64[D]')
+    ).astype('datetime64[s]')
+    start_times = (
+        day_bases[day_index[mask]]
+        + start_seconds[mask].astype('timedelta64[s]')
+    )
+    end_times = start_times + (durations[mask] * 3600).astype('timedelta64[s]')
+    note_index = rng.integers(0, len(SAMPLE_NOTES), size=start_times.size)
+
+    # Konversi sekali ke datetime Python, lalu stream ke bulk insert
+    # (satu prepared statement dalam satu transaksi)
+    rows = (
+        (
+            project_ids[proj_idx],
+            start_time,
+            end_time,
+            (end_time - start_time).total_seconds() / 3600,
+            SAMPLE_NOTES[note_idx]
+        )
+        for proj_idx, start_time, end_time, note_idx in zip(
+            project_index[mask],
+            start_times.tolist(),
+            end_times.tolist(),
+            note_index
+        )
+    )
+    activity_count = db.create_activities(rows)
+
     print(f"   ✓ {activity_count} aktivitas berhasil dibuat")
-    
+
     # Tambahkan aktivitas ongoing
     _add_ongoing_activity(project_ids[0])
-    
+
     return activity_count
 
 
@@ -10,12 +10,19 @@ Program Studi: Teknik Geofisika - Semester 5
 ================================================================================
 """
 
-import math
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
 from constants import DISPLAY_CONFIG
 
+# Lookup table format tanggal: satu dict lookup per panggilan format_date,
+# menggantikan rantai if/elif pada setiap baris tabel yang diformat.
+_DATE_FORMATS = {
+    "date": DISPLAY_CONFIG["date_format"],
+    "datetime": DISPLAY_CONFIG["datetime_format"],
+    "time": DISPLAY_CONFIG["time_format"]
+}
+
 
 def format_duration(hours: Optional[float]) -> str:
     """
@@ -44,14 +51,10 @@ def format_duration(hours: Optional[float]) -> str:
     Note:
         Nilai negatif dianggap tidak valid dan akan mengembalikan "0j 0m"
     """
-    # Handle None
-    if hours is None:
-        return "0j 0m"
-    
-    # Handle NaN
-    if isinstance(hours, float) and math.isnan(hours):
+    # Handle None dan NaN (hours != hours hanya True untuk NaN)
+    if hours is None or hours != hours:
         return "0j 0m"
-    
+
     # Handle nilai negatif atau nol
     if hours <= 0:
         return "0j 0m"
@@ -85,12 +88,9 @@ def format_duration_long(hours: Optional[float]) -> str:
         >>> format_duration_long(1.0)
         "1 jam 0 menit"
     """
-    if hours is None:
+    if hours is None or hours != hours:
         return "0 jam 0 menit"
-    
-    if isinstance(hours, float) and math.isnan(hours):
-        return "0 jam 0 menit"
-    
+
     if hours <= 0:
         return "0 jam 0 menit"
     
@@ -134,15 +134,8 @@ def format_date(dt: Optional[Union[datetime, str]],
         except ValueError:
             return "-"
     
-    # Pilih format berdasarkan tipe
-    if format_type == "date":
-        return dt.strftime(DISPLAY_CONFIG["date_format"])
-    elif format_type == "datetime":
-        return dt.strftime(DISPLAY_CONFIG["datetime_format"])
-    elif format_type == "time":
-        return dt.strftime(DISPLAY_CONFIG["time_format"])
-    else:
-        return dt.strftime(DISPLAY_CONFIG["datetime_format"])
+    # Pilih format berdasarkan tipe (default: datetime)
+    return dt.strftime(_DATE_FORMATS.get(format_type, _DATE_FORMATS["datetime"]))
 
 
 def format_percentage(value: Optional[float], decimals: int = 1) -> str:
@@ -164,12 +157,9 @@ def format_percentage(value: Optional[float], decimals: int = 1) -> str:
         >>> format_percentage(None)
         "0%"
     """
-    if value is None:
+    if value is None or value != value:
         return "0%"
-    
-    if isinstance(value, float) and math.isnan(value):
-        return "0%"
-    
+
     return f"{value:.{decimals}f}%"
 
 
@@ -190,12 +180,9 @@ def format_number(value: Optional[float], decimals: int = 2) -> str:
         >>> format_number(100.0, 0)
         "100"
     """
-    if value is None:
+    if value is None or value != value:
         return "0"
-    
-    if isinstance(value, float) and math.isnan(value):
-        return "0"
-    
+
     if decimals == 0:
         return str(int(value))
     
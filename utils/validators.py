@@ -15,6 +15,28 @@ from typing import Tuple, List, Optional
 
 from constants import VALIDATION_RULES, ERROR_MESSAGES, CATEGORIES, STATUS_OPTIONS
 
+# Konstanta validasi di-bind sekali saat import; hot path validasi cukup
+# membaca nama modul tanpa dict lookup berulang per pemanggilan.
+_PROJECT_NAME_MIN = VALIDATION_RULES["project_name_min_length"]
+_PROJECT_NAME_MAX = VALIDATION_RULES["project_name_max_length"]
+_ESTIMATED_HOURS_MIN = VALIDATION_RULES["estimated_hours_min"]
+_ESTIMATED_HOURS_MAX = VALIDATION_RULES["estimated_hours_max"]
+_NOTES_MAX = VALIDATION_RULES["notes_max_length"]
+
+_ERR_NAME_REQUIRED = ERROR_MESSAGES["project_name_required"]
+_ERR_NAME_TOO_SHORT = ERROR_MESSAGES["project_name_too_short"]
+_ERR_NAME_TOO_LONG = ERROR_MESSAGES["project_name_too_long"]
+_ERR_HOURS_INVALID = ERROR_MESSAGES["estimated_hours_invalid"]
+_ERR_END_BEFORE_START = ERROR_MESSAGES["end_time_before_start"]
+_ERR_NOTES_TOO_LONG = f"Catatan maksimal {_NOTES_MAX} karakter!"
+_ERR_CATEGORY_INVALID = "Kategori tidak valid!"
+_ERR_STATUS_INVALID = "Status tidak valid!"
+_ERR_PROJECT_REQUIRED = "Proyek harus dipilih!"
+
+# Frozenset untuk cek keanggotaan O(1), bukan linear scan list
+_CATEGORIES_SET = frozenset(CATEGORIES)
+_STATUS_SET = frozenset(STATUS_OPTIONS)
+
 
 def validate_project_name(name: str) -> Tuple[bool, str]:
     """
@@ -43,18 +65,18 @@ def validate_project_name(name: str) -> Tuple[bool, str]:
     """
     # Cek kosong
     if not name or not name.strip():
-        return False, ERROR_MESSAGES["project_name_required"]
-    
+        return False, _ERR_NAME_REQUIRED
+
     name = name.strip()
-    
+
     # Cek panjang minimal
-    if len(name) < VALIDATION_RULES["project_name_min_length"]:
-        return False, ERROR_MESSAGES["project_name_too_short"]
-    
+    if len(name) < _PROJECT_NAME_MIN:
+        return False, _ERR_NAME_TOO_SHORT
+
     # Cek panjang maksimal
-    if len(name) > VALIDATION_RULES["project_name_max_length"]:
-        return False, ERROR_MESSAGES["project_name_too_long"]
-    
+    if len(name) > _PROJECT_NAME_MAX:
+        return False, _ERR_NAME_TOO_LONG
+
     return True, ""
 
 
@@ -78,12 +100,9 @@ def validate_estimated_hours(hours: float) -> Tuple[bool, str]:
         >>> validate_estimated_hours(0.1)
         (False, "Estimasi jam harus antara 0.5 - 1000 jam!")
     """
-    min_hours = VALIDATION_RULES["estimated_hours_min"]
-    max_hours = VALIDATION_RULES["estimated_hours_max"]
-    
-    if hours < min_hours or hours > max_hours:
-        return False, ERROR_MESSAGES["estimated_hours_invalid"]
-    
+    if hours < _ESTIMATED_HOURS_MIN or hours > _ESTIMATED_HOURS_MAX:
+        return False, _ERR_HOURS_INVALID
+
     return True, ""
 
 
@@ -106,9 +125,9 @@ def validate_category(category: str) -> Tuple[bool, str]:
         >>> validate_category("Kategori Tidak Ada")
         (False, "Kategori tidak valid!")
     """
-    if category not in CATEGORIES:
-        return False, "Kategori tidak valid!"
-    
+    if category not in _CATEGORIES_SET:
+        return False, _ERR_CATEGORY_INVALID
+
     return True, ""
 
 
@@ -130,9 +149,9 @@ def validate_status(status: str) -> Tuple[bool, str]:
         >>> validate_status("invalid")
         (False, "Status tidak valid!")
     """
-    if status not in STATUS_OPTIONS:
-        return False, "Status tidak valid!"
-    
+    if status not in _STATUS_SET:
+        return False, _ERR_STATUS_INVALID
+
     return True, ""
 
 
@@ -169,7 +188,7 @@ def validate_time_range(start_time: datetime,
     
     # Cek end_time > start_time
     if end_time <= start_time:
-        return False, ERROR_MESSAGES["end_time_before_start"]
+        return False, _ERR_END_BEFORE_START
     
     return True, ""
 
@@ -193,13 +212,23 @@ def validate_notes(notes: str) -> Tuple[bool, str]:
         >>> validate_notes("x" * 600)
         (False, "Catatan maksimal 500 karakter!")
     """
-    if notes and len(notes) > VALIDATION_RULES["notes_max_length"]:
-        return False, f"Catatan maksimal {VALIDATION_RULES['notes_max_length']} karakter!"
-    
-    return True, ""
+    # Jalur umum: catatan kosong atau masih dalam batas
+    if not notes or len(notes) <= _NOTES_MAX:
+        return True, ""
+
+    return False, _ERR_NOTES_TOO_LONG
+
 
+# Urutan validator sejajar dengan urutan argumen validate_project;
+# menambah field baru cukup menambah satu entri di tabel ini
+_PROJECT_VALIDATORS = (
+    validate_project_name,
+    validate_estimated_hours,
+    validate_category,
+)
 
-def validate_project(name: str, estimated_hours: float, 
+
+def validate_project(name: str, estimated_hours: float,
                      category: str) -> Tuple[bool, List[str]]:
     """
     Memvalidasi semua field proyek sekaligus.
@@ -224,22 +253,15 @@ def validate_project(name: str, estimated_hours: float,
         (False, ["Nama proyek wajib diisi!", "Estimasi jam harus antara 0.5 - 1000 jam!", "Kategori tidak valid!"])
     """
     errors = []
-    
-    # Validasi nama
-    is_valid, error = validate_project_name(name)
-    if not is_valid:
-        errors.append(error)
-    
-    # Validasi estimasi jam
-    is_valid, error = validate_estimated_hours(estimated_hours)
-    if not is_valid:
-        errors.append(error)
-    
-    # Validasi kategori
-    is_valid, error = validate_category(category)
-    if not is_valid:
-        errors.append(error)
-    
+
+    # Loop table-driven: validator dan nilainya dipasangkan lewat zip,
+    # tanpa tiga blok if yang di-unroll manual
+    for validator, value in zip(_PROJECT_VALIDATORS,
+                                (name, estimated_hours, category)):
+        is_valid, error = validator(value)
+        if not is_valid:
+            errors.append(error)
+
     return len(errors) == 0, errors
 
 
@@ -263,22 +285,15 @@ def validate_activity(project_id: int, start_time: datetime,
         >>> validate_activity(1, datetime.now(), None, "Testing")
         (True, [])
     """
-    errors = []
-    
-    # Validasi project_id
-    if not project_id or project_id <= 0:
-        errors.append("Proyek harus dipilih!")
-    
-    # Validasi waktu
-    is_valid, error = validate_time_range(start_time, end_time)
-    if not is_valid:
-        errors.append(error)
-    
-    # Validasi notes
-    is_valid, error = validate_notes(notes)
-    if not is_valid:
-        errors.append(error)
-    
+    # Tabel (kondisi_gagal, pesan): satu comprehension menggantikan
+    # tiga blok if terpisah. end_time None = aktivitas ongoing (valid).
+    failed_checks = (
+        (not project_id or project_id <= 0, _ERR_PROJECT_REQUIRED),
+        (end_time is not None and end_time <= start_time, _ERR_END_BEFORE_START),
+        (bool(notes) and len(notes) > _NOTES_MAX, _ERR_NOTES_TOO_LONG),
+    )
+    errors = [message for is_failed, message in failed_checks if is_failed]
+
     return len(errors) == 0, errors
 
 
@@ -303,12 +318,7 @@ def sanitize_string(text: str) -> str:
     """
     if not text:
         return ""
-    
-    # Strip whitespace
-    text = text.strip()
-    
-    # Normalisasi spasi ganda
-    import re
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text
+
+    # str.split tanpa argumen sudah menangani strip + kolaps whitespace
+    # dalam satu lintasan C, tanpa mesin regex sama sekali
+    return ' '.join(text.split())
@@ -14,12 +14,12 @@ Program Studi: Teknik Geofisika - Semester 5
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, date, time, timedelta
 
 import database as db
 from utils import (
     format_duration,
-    format_elapsed_time,
     validate_time_range,
     validate_notes,
     sanitize_string
@@ -31,6 +31,82 @@ from constants import (
     DISPLAY_CONFIG
 )
 
+# Format tanggal-waktu di-bind sekali di level modul
+_DATETIME_FORMAT = DISPLAY_CONFIG['datetime_format']
+
+# Default jam kerja untuk widget: objek time immutable, cukup
+# dikonstruksi sekali saat import, bukan per rerun
+_WORK_START = time(DEFAULT_SETTINGS['default_work_start_hour'], 0)
+_WORK_END = time(DEFAULT_SETTINGS['default_work_end_hour'], 0)
+
+
+# ==================== CACHE DATA PROYEK ====================
+# Semua loader di-key dengan token db.get_data_version(): mutasi dari
+# halaman mana pun (termasuk CRUD proyek di halaman Proyek) mengubah
+# token sehingga cache lama otomatis terlewati tanpa invalidasi manual.
+
+@st.cache_data(ttl=30)
+def _get_active_projects(version: tuple) -> list:
+    """
+    Mengambil proyek aktif dengan cache lintas rerun Streamlit.
+
+    Streamlit menjalankan ulang seluruh script pada tiap interaksi
+    widget; cache ini mencegah query SQL yang sama dieksekusi
+    berulang kali.
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+
+    Returns:
+        list: List dictionary proyek aktif (lihat db.get_active_projects)
+    """
+    return db.get_active_projects()
+
+
+@st.cache_data(ttl=30)
+def _get_all_projects(version: tuple) -> list:
+    """
+    Mengambil semua proyek dengan cache lintas rerun Streamlit.
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+
+    Returns:
+        list: List dictionary proyek (lihat db.get_all_projects)
+    """
+    return db.get_all_projects()
+
+
+@st.cache_data(ttl=30)
+def _get_active_project_options(version: tuple) -> tuple:
+    """
+    Menyusun opsi selectbox proyek aktif sekali per isi cache.
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+
+    Returns:
+        tuple: (list id proyek, dict id -> nama) siap pakai untuk widget,
+               tanpa membangun ulang dict comprehension tiap rerun
+    """
+    options = {p['id']: p['name'] for p in _get_active_projects(version)}
+    return list(options.keys()), options
+
+
+@st.cache_data(ttl=30)
+def _get_all_project_options(version: tuple) -> tuple:
+    """
+    Menyusun opsi selectbox semua proyek sekali per isi cache.
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+
+    Returns:
+        tuple: (list id proyek, dict id -> nama) siap pakai untuk widget
+    """
+    options = {p['id']: p['name'] for p in _get_all_projects(version)}
+    return list(options.keys()), options
+
 
 def render():
     """
@@ -44,8 +120,12 @@ def render():
     """
     st.header("⏱️ Pencatatan Waktu")
     
+    # Satu pembacaan jam untuk seluruh render pass
+    now = datetime.now()
+    today = now.date()
+    
     # Tampilkan aktivitas ongoing di atas
-    _render_ongoing_activities()
+    _render_ongoing_activities(now)
     
     # Tab utama
     tab_start, tab_manual, tab_history = st.tabs([
@@ -55,18 +135,21 @@ def render():
     ])
     
     with tab_start:
-        _render_start_activity_form()
+        _render_start_activity_form(today)
     
     with tab_manual:
-        _render_manual_input_form()
+        _render_manual_input_form(today)
     
     with tab_history:
-        _render_activity_history()
+        _render_activity_history(today)
 
 
-def _render_ongoing_activities():
+def _render_ongoing_activities(now: datetime):
     """
     Merender daftar aktivitas yang sedang berjalan.
+    
+    Args:
+        now: Waktu sekarang (dibaca sekali per render pass)
     """
     try:
         ongoing = db.get_ongoing_activities()
@@ -80,46 +163,54 @@ def _render_ongoing_activities():
     st.subheader("🔴 Aktivitas Sedang Berjalan")
     
     for activity in ongoing:
-        _render_ongoing_card(activity)
+        _render_ongoing_card(activity, now)
     
     st.divider()
 
 
-def _render_ongoing_card(activity: dict):
+def _render_ongoing_card(activity: dict, now: datetime):
     """
     Merender kartu untuk aktivitas yang sedang berjalan.
     
     Args:
         activity: Dictionary data aktivitas
+        now: Waktu sekarang (dibaca sekali per render pass)
     """
-    start_time = datetime.fromisoformat(activity['start_time'])
-    elapsed = format_elapsed_time(start_time)
-    
+    # start_time sudah berupa datetime langsung dari layer database
+    start_time = activity['start_time']
+    elapsed = format_duration((now - start_time).total_seconds() / 3600)
+
+    # Key session state dibentuk sekali per kartu, bukan per akses
+    aid = activity['id']
+    end_key = f'ending_{aid}'
+
     col_info, col_elapsed, col_action = st.columns([3, 1, 1])
-    
+
     with col_info:
         st.write(f"**{activity['project_name']}**")
-        st.caption(f"Mulai: {start_time.strftime('%d/%m/%Y %H:%M')}")
-    
+        st.caption(f"Mulai: {start_time.strftime(_DATETIME_FORMAT)}")
+
     with col_elapsed:
         st.write(f"⏱️ {elapsed}")
-    
+
     with col_action:
-        if st.button("⏹️ Selesai", key=f"end_{activity['id']}"):
-            st.session_state[f'ending_{activity["id"]}'] = True
-    
+        if st.button("⏹️ Selesai", key=f"end_{aid}"):
+            st.session_state[end_key] = True
+
     # Form untuk menyelesaikan aktivitas
-    if st.session_state.get(f'ending_{activity["id"]}'):
-        _render_end_activity_form(activity, start_time)
+    if st.session_state.get(end_key):
+        _render_end_activity_form(activity, start_time, end_key)
 
 
-def _render_end_activity_form(activity: dict, start_time: datetime):
+def _render_end_activity_form(activity: dict, start_time: datetime,
+                              end_key: str):
     """
     Merender form untuk menyelesaikan aktivitas.
-    
+
     Args:
         activity: Dictionary data aktivitas
         start_time: Waktu mulai aktivitas
+        end_key: Key session state 'ending_<id>' (sudah dibentuk pemanggil)
     """
     with st.form(f"end_form_{activity['id']}"):
         end_option = st.radio(
@@ -129,11 +220,12 @@ def _render_end_activity_form(activity: dict, start_time: datetime):
         )
         
         if end_option == "Manual":
+            now = datetime.now()
             col_date, col_time = st.columns(2)
-            end_date = col_date.date_input("Tanggal", value=date.today())
+            end_date = col_date.date_input("Tanggal", value=now.date())
             end_time_input = col_time.time_input(
                 "Jam", 
-                value=datetime.now().time()
+                value=now.time()
             )
         
         col_confirm, col_cancel = st.columns(2)
@@ -149,21 +241,24 @@ def _render_end_activity_form(activity: dict, start_time: datetime):
             _end_activity(activity['id'], end_dt, start_time)
         
         if cancelled:
-            del st.session_state[f'ending_{activity["id"]}']
+            del st.session_state[end_key]
             st.rerun()
 
 
-def _render_start_activity_form():
+def _render_start_activity_form(today: date):
     """
     Merender form untuk memulai aktivitas baru.
+    
+    Args:
+        today: Tanggal hari ini (dibaca sekali per render pass)
     """
     try:
-        active_projects = db.get_active_projects()
+        project_ids, project_options = _get_active_project_options(db.get_data_version())
     except Exception as e:
         st.error(f"Gagal mengambil proyek: {str(e)}")
         return
     
-    if not active_projects:
+    if not project_ids:
         st.warning(
             "Tidak ada proyek aktif. "
             "Silakan buat proyek baru di menu Proyek terlebih dahulu."
@@ -171,11 +266,10 @@ def _render_start_activity_form():
         return
     
     with st.form("start_activity_form"):
-        # Pilih proyek
-        project_options = {p['id']: p['name'] for p in active_projects}
+        # Pilih proyek (opsi sudah dibangun di cache)
         selected_project = st.selectbox(
             "Pilih Proyek *",
-            options=list(project_options.keys()),
+            options=project_ids,
             format_func=lambda x: project_options[x]
         )
         
@@ -188,10 +282,10 @@ def _render_start_activity_form():
         
         if start_option == "Manual":
             col_date, col_time = st.columns(2)
-            start_date = col_date.date_input("Tanggal", value=date.today())
+            start_date = col_date.date_input("Tanggal", value=today)
             start_time_input = col_time.time_input(
                 "Jam", 
-                value=time(DEFAULT_SETTINGS['default_work_start_hour'], 0)
+                value=_WORK_START
             )
         
         # Catatan
@@ -211,17 +305,20 @@ def _render_start_activity_form():
             _start_activity(selected_project, start_dt, notes)
 
 
-def _render_manual_input_form():
+def _render_manual_input_form(today: date):
     """
     Merender form untuk input aktivitas manual (dengan waktu mulai dan selesai).
+
+    Args:
+        today: Tanggal hari ini (dihitung sekali di render)
     """
     try:
-        active_projects = db.get_active_projects()
+        project_ids, project_options = _get_active_project_options(db.get_data_version())
     except Exception as e:
         st.error(f"Gagal mengambil proyek: {str(e)}")
         return
     
-    if not active_projects:
+    if not project_ids:
         st.warning(
             "Tidak ada proyek aktif. "
             "Silakan buat proyek baru di menu Proyek terlebih dahulu."
@@ -229,11 +326,10 @@ def _render_manual_input_form():
         return
     
     with st.form("manual_activity_form", clear_on_submit=True):
-        # Pilih proyek
-        project_options = {p['id']: p['name'] for p in active_projects}
+        # Pilih proyek (opsi sudah dibangun di cache)
         selected_project = st.selectbox(
             "Pilih Proyek *",
-            options=list(project_options.keys()),
+            options=project_ids,
             format_func=lambda x: project_options[x],
             key="manual_project"
         )
@@ -243,12 +339,12 @@ def _render_manual_input_form():
         col_start_date, col_start_time = st.columns(2)
         start_date = col_start_date.date_input(
             "Tanggal Mulai", 
-            value=date.today(),
+            value=today,
             key="manual_start_date"
         )
         start_time_input = col_start_time.time_input(
             "Jam Mulai", 
-            value=time(DEFAULT_SETTINGS['default_work_start_hour'], 0),
+            value=_WORK_START,
             key="manual_start_time"
         )
         
@@ -257,12 +353,12 @@ def _render_manual_input_form():
         col_end_date, col_end_time = st.columns(2)
         end_date = col_end_date.date_input(
             "Tanggal Selesai", 
-            value=date.today(),
+            value=today,
             key="manual_end_date"
         )
         end_time_input = col_end_time.time_input(
             "Jam Selesai", 
-            value=time(DEFAULT_SETTINGS['default_work_end_hour'], 0),
+            value=_WORK_END,
             key="manual_end_time"
         )
         
@@ -289,22 +385,24 @@ def _render_manual_input_form():
             _create_manual_activity(selected_project, start_dt, end_dt, notes)
 
 
-def _render_activity_history():
+def _render_activity_history(today: date):
     """
     Merender riwayat aktivitas dengan filter.
+    
+    Args:
+        today: Tanggal hari ini (dibaca sekali per render pass)
     """
     # Filter
     col_project_filter, col_date_filter = st.columns(2)
     
     try:
-        all_projects = db.get_all_projects()
+        _, project_names = _get_all_project_options(db.get_data_version())
     except Exception as e:
         st.error(f"Gagal mengambil proyek: {str(e)}")
         return
     
     with col_project_filter:
-        filter_options = {"all": "Semua Proyek"}
-        filter_options.update({p['id']: p['name'] for p in all_projects})
+        filter_options = {"all": "Semua Proyek", **project_names}
         selected_filter = st.selectbox(
             "Filter Proyek",
             options=list(filter_options.keys()),
@@ -312,77 +410,100 @@ def _render_activity_history():
         )
     
     with col_date_filter:
-        default_start = date.today() - timedelta(days=DISPLAY_CONFIG['default_days_filter'])
+        default_start = today - timedelta(days=DISPLAY_CONFIG['default_days_filter'])
         date_range = st.date_input(
             "Rentang Tanggal",
-            value=(default_start, date.today())
+            value=(default_start, today)
         )
     
-    # Ambil data
+    # Ambil data: filter proyek dan tanggal dieksekusi langsung di SQL
+    project_filter = None if selected_filter == "all" else selected_filter
+    summary = None
+
     try:
-        if selected_filter == "all":
+        if len(date_range) == 2:
+            start_filter = datetime.combine(date_range[0], time(0, 0))
+            end_filter = datetime.combine(date_range[1], time(23, 59, 59))
+
+            # Agregat COUNT/SUM dihitung di SQL terlebih dahulu:
+            # rentang kosong terdeteksi tanpa menarik satu baris pun
+            summary = db.get_activity_summary(
+                start_filter, end_filter, project_filter
+            )
+            if summary[0] == 0:
+                st.info("Tidak ada aktivitas pada rentang tanggal ini.")
+                return
+
+            activities = db.get_activities_by_range(
+                start_filter, end_filter, project_filter
+            )
+        elif project_filter is None:
             activities = db.get_all_activities()
         else:
-            activities = db.get_activities_by_project(selected_filter)
+            activities = db.get_activities_by_project(project_filter)
     except Exception as e:
         st.error(f"Gagal mengambil aktivitas: {str(e)}")
         return
-    
+
     if not activities:
         st.info("Belum ada aktivitas tercatat.")
         return
-    
-    # Konversi ke DataFrame
+
+    # Konversi ke DataFrame; timestamp sudah berupa datetime dari layer
+    # database, to_datetime tinggal mengemasnya ke dtype datetime64
     df = pd.DataFrame(activities)
-    df['start_time'] = pd.to_datetime(df['start_time'], format='mixed')
-    df['end_time'] = pd.to_datetime(df['end_time'], format='mixed', errors='coerce')
-    
-    # Filter berdasarkan tanggal
-    if len(date_range) == 2:
-        start_filter = datetime.combine(date_range[0], time(0, 0))
-        end_filter = datetime.combine(date_range[1], time(23, 59, 59))
-        df = df[(df['start_time'] >= start_filter) & (df['start_time'] <= end_filter)]
-    
-    if df.empty:
-        st.info("Tidak ada aktivitas pada rentang tanggal ini.")
-        return
-    
-    # Ringkasan
-    total_hours = df['duration_hours'].sum() if df['duration_hours'].notna().any() else 0
-    st.write(f"**{len(df)} aktivitas** | Total: **{format_duration(total_hours)}**")
-    
-    # Format kolom tampilan
-    df['Durasi'] = df['duration_hours'].apply(
-        lambda x: format_duration(x) if pd.notna(x) else "🔴 Berjalan"
+    df['start_time'] = pd.to_datetime(df['start_time'])
+    df['end_time'] = pd.to_datetime(df['end_time'], errors='coerce')
+    
+    # Ringkasan: pakai agregat SQL bila tersedia; fallback pandas
+    # (sum sudah melewati NaN dan mengembalikan 0 untuk kolom kosong)
+    if summary is not None:
+        activity_count, total_hours = summary
+    else:
+        activity_count = len(df)
+        total_hours = df['duration_hours'].sum()
+    st.write(f"**{activity_count} aktivitas** | Total: **{format_duration(total_hours)}**")
+    
+    # Format kolom tampilan: durasi diformat vektorisasi dari total menit
+    # ("Xj Ym" seperti format_duration); baris NULL = aktivitas ongoing
+    total_minutes = (df['duration_hours'] * 60).fillna(0).astype(int)
+    formatted = (
+        total_minutes.floordiv(60).astype(str) + 'j '
+        + total_minutes.mod(60).astype(str) + 'm'
     )
-    df['Waktu'] = df['start_time'].dt.strftime(DISPLAY_CONFIG['datetime_format'])
-    
-    display_df = df[['project_name', 'Waktu', 'Durasi', 'notes']].rename(columns={
-        'project_name': 'Proyek',
-        'notes': 'Catatan'
+    df['Durasi'] = np.where(df['duration_hours'].notna(), formatted, "🔴 Berjalan")
+    df['Waktu'] = df['start_time'].dt.strftime(_DATETIME_FORMAT)
+    
+    # Susun langsung dari array kolom: tanpa copy proyeksi + copy rename
+    display_df = pd.DataFrame({
+        'Proyek': df['project_name'].values,
+        'Waktu': df['Waktu'].values,
+        'Durasi': df['Durasi'].values,
+        'Catatan': df['notes'].values
     })
     
     st.dataframe(display_df, use_container_width=True, hide_index=True)
     
-    # Kelola aktivitas
+    # Kelola aktivitas: index by id agar lookup baris O(1), bukan scan
+    activities_by_id = df.set_index('id', drop=False)
     st.divider()
-    _render_activity_management(df, all_projects)
+    _render_activity_management(df, activities_by_id)
 
 
-def _render_activity_management(df: pd.DataFrame, all_projects: list):
+def _render_activity_management(df: pd.DataFrame,
+                                activities_by_id: pd.DataFrame):
     """
     Merender bagian untuk mengedit/menghapus aktivitas.
     
     Args:
         df: DataFrame aktivitas
-        all_projects: List semua proyek
+        activities_by_id: DataFrame yang sama ber-index kolom id
     """
     st.write("**Kelola Aktivitas**")
     
-    activity_options = {
-        row['id']: f"{row['project_name']} - {row['start_time'].strftime('%d/%m %H:%M')}" 
-        for _, row in df.iterrows()
-    }
+    # Label disusun vektorisasi (strftime level kolom), tanpa iterrows
+    labels = df['project_name'] + ' - ' + df['start_time'].dt.strftime('%d/%m %H:%M')
+    activity_options = dict(zip(df['id'], labels))
     
     selected_activity = st.selectbox(
         "Pilih aktivitas:",
@@ -402,27 +523,31 @@ def _render_activity_management(df: pd.DataFrame, all_projects: list):
     
     # Form edit
     if st.session_state.get('edit_activity'):
-        _render_edit_activity_form(df, all_projects)
+        _render_edit_activity_form(activities_by_id)
 
 
-def _render_edit_activity_form(df: pd.DataFrame, all_projects: list):
+def _render_edit_activity_form(activities_by_id: pd.DataFrame):
     """
     Merender form untuk mengedit aktivitas.
+    
+    Args:
+        activities_by_id: DataFrame aktivitas ber-index kolom id
     """
     activity_id = st.session_state['edit_activity']
-    activity_data = df[df['id'] == activity_id].iloc[0]
+    # Lookup hash lewat index, tanpa boolean mask sepanjang DataFrame
+    activity_data = activities_by_id.loc[activity_id]
     
     with st.form("edit_activity_form"):
         st.write("**Edit Aktivitas**")
         
-        # Pilih proyek
-        project_options = {p['id']: p['name'] for p in all_projects}
-        current_project_index = list(project_options.keys()).index(activity_data['project_id']) \
+        # Pilih proyek (opsi sudah dibangun di cache)
+        project_ids, project_options = _get_all_project_options(db.get_data_version())
+        current_project_index = project_ids.index(activity_data['project_id']) \
             if activity_data['project_id'] in project_options else 0
         
         new_project = st.selectbox(
             "Proyek",
-            options=list(project_options.keys()),
+            options=project_ids,
             format_func=lambda x: project_options[x],
             index=current_project_index
         )
@@ -504,8 +629,9 @@ def _end_activity(activity_id: int, end_time: datetime, start_time: datetime):
     try:
         db.end_activity(activity_id, end_time)
         # Bersihkan session state
-        if f'ending_{activity_id}' in st.session_state:
-            del st.session_state[f'ending_{activity_id}']
+        end_key = f'ending_{activity_id}'
+        if end_key in st.session_state:
+            del st.session_state[end_key]
         st.success(SUCCESS_MESSAGES['activity_ended'])
         st.rerun()
     except ValueError as e:
@@ -544,7 +670,9 @@ def _update_activity(activity_id: int, project_id: int, start_time: datetime,
     """Memperbarui aktivitas."""
     notes = sanitize_string(notes)
     
-    if end_time:
+    # Fast path: aktivitas ongoing (end_time None) selalu valid,
+    # tanpa menyeberangi batas fungsi validator
+    if end_time is not None:
         is_valid, error = validate_time_range(start_time, end_time)
         if not is_valid:
             st.error(error)
@@ -11,20 +11,24 @@ Program Studi: Teknik Geofisika - Semester 5
 ================================================================================
 """
 
+import html
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 
+import cache
 import database as db
 from utils import (
     format_duration,
-    calculate_efficiency,
-    calculate_statistics,
-    get_efficiency_color
+    calculate_statistics
+)
+from constants import (
+    CHART_CONFIG,
+    CHART_COLORS,
+    EFFICIENCY_THRESHOLDS,
+    EFFICIENCY_COLORS
 )
-from constants import CHART_CONFIG, CHART_COLORS
 
 
 def render():
@@ -38,35 +42,38 @@ def render():
     """
     st.header("📈 Analisis Statistik")
 
-    # Ambil data durasi
+    # Token versi dihitung sekali per render; satu bundle ter-cache
+    # menggantikan beberapa round-trip query terpisah
     try:
-        durations = db.get_duration_array()
+        version = db.get_data_version()
+        bundle = cache.get_analysis_bundle(version)
     except Exception as e:
         st.error(f"Gagal mengambil data: {str(e)}")
         return
 
-    if not durations:
+    durations = bundle['durations']
+    project_stats = bundle['project_stats']
+
+    if durations.size == 0:
         st.info(
             "Belum ada data aktivitas untuk dianalisis. "
             "Silakan catat beberapa aktivitas terlebih dahulu."
         )
         return
 
-    # Konversi ke numpy array
-    duration_array = np.array(durations)
-
     # ==================== SECTION: STATISTIK DESKRIPTIF ====================
-    _render_descriptive_statistics(duration_array)
+    # durations sudah berupa array float64 langsung dari layer database
+    _render_descriptive_statistics(durations)
 
     st.divider()
 
     # ==================== SECTION: DURASI PER PROYEK ====================
-    _render_duration_per_project()
+    _render_duration_per_project(project_stats)
 
     st.divider()
 
     # ==================== SECTION: EFISIENSI PROYEK ====================
-    _render_efficiency_chart()
+    _render_efficiency_chart(project_stats)
 
 
 def _render_descriptive_statistics(data: np.ndarray):
@@ -79,8 +86,8 @@ def _render_descriptive_statistics(data: np.ndarray):
     st.subheader("📊 Statistik Deskriptif Durasi Aktivitas")
     st.caption("Dihitung menggunakan NumPy dan SciPy")
 
-    # Hitung statistik
-    stats = calculate_statistics(data.tolist())
+    # Hitung statistik langsung pada ndarray, tanpa boxing ke list Python
+    stats = calculate_statistics(data)
 
     # Tampilkan dalam 3 kolom
     col_central, col_spread, col_quartile = st.columns(3)
@@ -125,18 +132,15 @@ def _render_descriptive_statistics(data: np.ndarray):
         )
 
 
-def _render_duration_per_project():
+def _render_duration_per_project(project_stats: list):
     """
     Merender bar chart rata-rata durasi aktivitas per proyek.
+
+    Args:
+        project_stats: Statistik per proyek (diambil sekali di render)
     """
     st.subheader("⏱️ Rata-rata Durasi per Proyek")
 
-    try:
-        project_stats = db.get_project_statistics()
-    except Exception as e:
-        st.error(f"Gagal mengambil statistik proyek: {str(e)}")
-        return
-
     if not project_stats:
         st.info("Belum ada data proyek untuk dianalisis.")
         return
@@ -158,17 +162,46 @@ def _render_duration_per_project():
         st.info("Belum ada aktivitas tercatat untuk proyek manapun.")
         return
 
-    df_duration = pd.DataFrame(duration_data)
+    # Figure dibangun lewat builder ter-cache: rerun dengan data sama
+    # tidak membangun ulang objek plotly
+    fig = _build_duration_fig(
+        tuple((d['Proyek'], d['Rata-rata Durasi']) for d in duration_data)
+    )
+
+    st.plotly_chart(fig, width="stretch")
+
+    # Keterangan
+    st.caption("📌 Grafik menunjukkan rata-rata durasi per aktivitas untuk setiap proyek")
+
+
+@st.cache_resource(max_entries=32)
+def _build_duration_fig(duration_points: tuple) -> "go.Figure":
+    """
+    Membangun bar chart rata-rata durasi (ter-cache per isi data).
+
+    Args:
+        duration_points: Tuple pasangan (nama proyek, rata-rata durasi)
+
+    Returns:
+        go.Figure: Bar chart horizontal durasi per proyek
+    """
+    # Import lokal: plotly (ratusan ms) tidak ikut dimuat saat cold
+    # start; sys.modules meng-cache-nya setelah pemanggilan pertama
+    import plotly.graph_objects as go
+
+    names, avg_durations = zip(*duration_points)
 
     # Buat bar chart horizontal
     fig = go.Figure()
 
     fig.add_trace(go.Bar(
-        y=df_duration['Proyek'],
-        x=df_duration['Rata-rata Durasi'],
+        y=list(names),
+        x=list(avg_durations),
         orientation='h',
         marker_color=CHART_COLORS['primary'],
-        text=[f"{d:.1f} jam" for d in df_duration['Rata-rata Durasi']],
+        # Format label di front-end lewat texttemplate: tanpa list
+        # string Python per batang, payload wire lebih kecil
+        texttemplate='%{x:.1f} jam',
         textposition='outside',
         hovertemplate=(
             "<b>%{y}</b><br>"
@@ -178,7 +211,7 @@ def _render_duration_per_project():
     ))
 
     # Layout
-    max_duration = df_duration['Rata-rata Durasi'].max()
+    max_duration = max(avg_durations)
     fig.update_xaxes(
         title_text="Rata-rata Durasi (jam)",
         range=[0, max_duration * 1.3]
@@ -186,7 +219,7 @@ def _render_duration_per_project():
     fig.update_yaxes(title_text="")
 
     # Tinggi dinamis
-    chart_height = max(CHART_CONFIG['height_small'], len(df_duration) * 50)
+    chart_height = max(CHART_CONFIG['height_small'], len(duration_points) * 50)
 
     fig.update_layout(
         height=chart_height,
@@ -194,15 +227,15 @@ def _render_duration_per_project():
         showlegend=False
     )
 
-    st.plotly_chart(fig, width="stretch")
+    return fig
 
-    # Keterangan
-    st.caption("📌 Grafik menunjukkan rata-rata durasi per aktivitas untuk setiap proyek")
 
-
-def _render_efficiency_chart():
+def _render_efficiency_chart(project_stats: list):
     """
     Merender bar chart efisiensi proyek dengan penjelasan yang mudah dipahami.
+
+    Args:
+        project_stats: Statistik per proyek (diambil sekali di render)
     """
     st.subheader("⚡ Efisiensi Proyek")
     
@@ -213,74 +246,162 @@ def _render_efficiency_chart():
         "**Rumus:** Efisiensi (%) = (Jam Tercatat ÷ Jam Estimasi) × 100"
     )
 
-    try:
-        project_stats = db.get_project_statistics()
-    except Exception as e:
-        st.error(f"Gagal mengambil statistik proyek: {str(e)}")
-        return
-
     if not project_stats:
         st.info("Belum ada data proyek untuk dianalisis.")
         return
 
-    # Siapkan data efisiensi
-    efficiency_data = []
-    for project in project_stats:
-        logged = project['total_logged_hours'] or 0
-        estimated = project['estimated_hours'] or 1
-        efficiency = calculate_efficiency(logged, estimated)
-        
-        # Tentukan status dan interpretasi berdasarkan efisiensi
-        if efficiency < 50:
-            status = "🔴 Baru Dimulai"
-            sisa = estimated - logged
-            interpretasi = f"Sisa {sisa:.1f} jam lagi untuk mencapai target"
-        elif efficiency < 80:
-            status = "🟡 Sedang Berjalan"
-            sisa = estimated - logged
-            interpretasi = f"Sisa {sisa:.1f} jam lagi ({100-efficiency:.0f}%)"
-        elif efficiency < 100:
-            status = "🟢 Hampir Selesai"
-            sisa = estimated - logged
-            interpretasi = f"Tinggal {sisa:.1f} jam lagi!"
-        elif efficiency == 100:
-            status = "🟢 Selesai"
-            interpretasi = "Target tercapai tepat waktu!"
+    # Siapkan data efisiensi: aritmetika dan percabangan status
+    # dihitung vektorisasi, bukan if-chain per proyek. Array dibangun
+    # langsung dari baris query tanpa DataFrame perantara.
+    names = [p['name'] for p in project_stats]
+    logged = np.array([p['total_logged_hours'] or 0 for p in project_stats],
+                      dtype=np.float64)
+    estimated = np.array([p['estimated_hours'] or 0 for p in project_stats],
+                         dtype=np.float64)
+    estimated[estimated == 0] = 1.0
+    efficiency = logged / estimated * 100.0
+    sisa = estimated - logged
+
+    conditions = [
+        efficiency < 50,
+        efficiency < 80,
+        efficiency < 100,
+        efficiency == 100
+    ]
+    statuses = np.select(conditions, [
+        "🔴 Baru Dimulai", "🟡 Sedang Berjalan",
+        "🟢 Hampir Selesai", "🟢 Selesai"
+    ], default="🔵 Melebihi Estimasi")
+    buckets = np.select(conditions, [0, 1, 2, 3], default=4)
+
+    # Interpretasi butuh format float per baris; angkanya sudah
+    # dihitung vektorisasi di atas
+    interpretations = []
+    for bucket, sisa_val, eff_val in zip(buckets, sisa, efficiency):
+        if bucket == 0:
+            interpretations.append(
+                f"Sisa {sisa_val:.1f} jam lagi untuk mencapai target"
+            )
+        elif bucket == 1:
+            interpretations.append(
+                f"Sisa {sisa_val:.1f} jam lagi ({100 - eff_val:.0f}%)"
+            )
+        elif bucket == 2:
+            interpretations.append(f"Tinggal {sisa_val:.1f} jam lagi!")
+        elif bucket == 3:
+            interpretations.append("Target tercapai tepat waktu!")
         else:
-            status = "🔵 Melebihi Estimasi"
-            lebih = logged - estimated
-            interpretasi = f"Lebih {lebih:.1f} jam dari estimasi awal"
+            interpretations.append(
+                f"Lebih {-sisa_val:.1f} jam dari estimasi awal"
+            )
+
+    df_efficiency = pd.DataFrame({
+        'Proyek': names,
+        'Efisiensi': efficiency,
+        'Tercatat': logged,
+        'Estimasi': estimated,
+        'Status': statuses,
+        'Interpretasi': interpretations
+    })
+
+    fig = _build_efficiency_fig(
+        tuple(zip(df_efficiency['Proyek'], df_efficiency['Efisiensi'],
+                  df_efficiency['Tercatat'], df_efficiency['Estimasi']))
+    )
 
-        efficiency_data.append({
-            'Proyek': project['name'],
-            'Efisiensi': efficiency,
-            'Tercatat': logged,
-            'Estimasi': estimated,
-            'Status': status,
-            'Interpretasi': interpretasi
-        })
+    st.plotly_chart(fig, width="stretch")
+
+    # Legenda warna
+    st.markdown(
+        """
+        | Warna | Range | Arti |
+        |-------|-------|------|
+        | 🔴 Merah | < 50% | Proyek baru dimulai |
+        | 🟡 Kuning | 50-80% | Sedang berjalan |
+        | 🟢 Hijau | 80-99% | Hampir selesai |
+        | 🟢 Hijau | = 100% | Selesai tepat waktu |
+        | 🔵 Biru | > 100% | Waktu melebihi estimasi awal |
+        """
+    )
+    
+    st.divider()
+    
+    # Tabel detail per proyek
+    st.subheader("📋 Detail Efisiensi per Proyek")
+    
+    # Satu tabel markdown untuk semua baris: container + tiga kolom
+    # per proyek berarti banyak pesan kecil ke front-end, satu
+    # st.markdown cukup satu round-trip. itertuples(name=None)
+    # menghasilkan tuple polos dari C (urutan = urutan kolom).
+    table_lines = [
+        "| Proyek | Efisiensi | Status | Interpretasi |",
+        "|--------|-----------|--------|--------------|",
+    ]
+    rows = df_efficiency.itertuples(index=False, name=None)
+    for proyek, eff, tercatat, estimasi, status, interpretasi in rows:
+        # Nama proyek adalah input pengguna: escape HTML dan karakter
+        # pipa agar tidak merusak markup tabel (apalagi dieksekusi)
+        safe_proyek = html.escape(proyek).replace("|", "&#124;")
+        table_lines.append(
+            f"| **{safe_proyek}**<br>Tercatat: {tercatat:.1f} jam / "
+            f"Estimasi: {estimasi:.1f} jam "
+            f"| **{eff:.0f}%** | {status} | {interpretasi} |"
+        )
+    
+    st.markdown("\n".join(table_lines), unsafe_allow_html=True)
 
-    df_efficiency = pd.DataFrame(efficiency_data)
 
-    # Tentukan warna berdasarkan efisiensi
-    colors = [get_efficiency_color(eff) for eff in df_efficiency['Efisiensi']]
+@st.cache_resource(max_entries=32)
+def _build_efficiency_fig(efficiency_points: tuple) -> "go.Figure":
+    """
+    Membangun bar chart efisiensi proyek (ter-cache per isi data).
+
+    Args:
+        efficiency_points: Tuple tuple (proyek, efisiensi, tercatat,
+                           estimasi) per baris
+
+    Returns:
+        go.Figure: Bar chart horizontal efisiensi dengan garis target
+    """
+    # Import lokal: plotly tidak ikut dimuat saat cold start
+    import plotly.graph_objects as go
+
+    names, efficiencies, logged, estimated = zip(*efficiency_points)
+
+    # Tentukan warna berdasarkan efisiensi: satu np.select level
+    # array, bukan pemanggilan get_efficiency_color per proyek
+    eff_arr = np.asarray(efficiencies, dtype=float)
+    colors = np.select(
+        [
+            eff_arr < EFFICIENCY_THRESHOLDS["critical"],
+            eff_arr < EFFICIENCY_THRESHOLDS["warning"],
+            eff_arr <= EFFICIENCY_THRESHOLDS["good"]
+        ],
+        [
+            EFFICIENCY_COLORS["critical"],
+            EFFICIENCY_COLORS["warning"],
+            EFFICIENCY_COLORS["good"]
+        ],
+        default=EFFICIENCY_COLORS["excellent"]
+    ).tolist()
 
     # Buat bar chart horizontal
     fig = go.Figure()
 
     fig.add_trace(go.Bar(
-        y=df_efficiency['Proyek'],
-        x=df_efficiency['Efisiensi'],
+        y=list(names),
+        x=list(efficiencies),
         orientation='h',
         marker_color=colors,
-        text=[f"{eff:.0f}%" for eff in df_efficiency['Efisiensi']],
+        # Label diformat front-end (texttemplate), bukan list Python
+        texttemplate='%{x:.0f}%',
         textposition='outside',
         hovertemplate=(
             "<b>%{y}</b><br>"
             "Efisiensi: <b>%{x:.1f}%</b><br>"
             "<extra></extra>"
         ),
-        customdata=df_efficiency[['Tercatat', 'Estimasi']].values
+        customdata=list(zip(logged, estimated))
     ))
 
     # Tambahkan garis target 100%
@@ -293,7 +414,7 @@ def _render_efficiency_chart():
     )
 
     # Layout
-    max_efficiency = df_efficiency['Efisiensi'].max()
+    max_efficiency = max(efficiencies)
     fig.update_xaxes(
         title_text="Efisiensi (%)",
         range=[0, max(max_efficiency * 1.2, 120)]
@@ -301,7 +422,7 @@ def _render_efficiency_chart():
     fig.update_yaxes(title_text="")
 
     # Tinggi dinamis berdasarkan jumlah proyek
-    chart_height = max(CHART_CONFIG['height_small'], len(df_efficiency) * 50)
+    chart_height = max(CHART_CONFIG['height_small'], len(efficiency_points) * 50)
 
     fig.update_layout(
         height=chart_height,
@@ -309,47 +430,4 @@ def _render_efficiency_chart():
         showlegend=False
     )
 
-    st.plotly_chart(fig, width="stretch")
-
-    # Legenda warna
-    st.markdown(
-        """
-        | Warna | Range | Arti |
-        |-------|-------|------|
-        | 🔴 Merah | < 50% | Proyek baru dimulai |
-        | 🟡 Kuning | 50-80% | Sedang berjalan |
-        | 🟢 Hijau | 80-99% | Hampir selesai |
-        | 🟢 Hijau | = 100% | Selesai tepat waktu |
-        | 🔵 Biru | > 100% | Waktu melebihi estimasi awal |
-        """
-    )
-    
-    st.divider()
-    
-    # Tabel detail per proyek
-    st.subheader("📋 Detail Efisiensi per Proyek")
-    
-    for idx, row in df_efficiency.iterrows():
-        with st.container():
-            col1, col2, col3 = st.columns([2, 1, 2])
-            
-            with col1:
-                st.write(f"**{row['Proyek']}**")
-                st.caption(f"Tercatat: {row['Tercatat']:.1f} jam / Estimasi: {row['Estimasi']:.1f} jam")
-            
-            with col2:
-                st.write(f"**{row['Efisiensi']:.0f}%**")
-                st.caption(row['Status'])
-            
-            with col3:
-                # Tampilkan interpretasi dengan warna yang sesuai
-                if row['Efisiensi'] < 50:
-                    st.error(row['Interpretasi'])
-                elif row['Efisiensi'] < 80:
-                    st.warning(row['Interpretasi'])
-                elif row['Efisiensi'] <= 100:
-                    st.success(row['Interpretasi'])
-                else:
-                    st.info(row['Interpretasi'])
-            
-            st.divider()
+    return fig
@@ -10,42 +10,46 @@ Program Studi: Teknik Geofisika - Semester 5
 ================================================================================
 """
 
+import html
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import calendar
+import numpy as np
+from datetime import date
 
+import cache
 import database as db
-from utils import format_duration, calculate_efficiency
-from constants import CHART_CONFIG, CHART_COLORS
+from utils import format_duration
+from constants import CHART_CONFIG, CHART_COLORS, EFFICIENCY_COLORS
 
 
 def render():
     st.header("Dashboard")
     
+    # Token versi dihitung sekali per render; satu bundle ter-cache
+    # menggantikan beberapa round-trip query terpisah
     try:
-        stats_data = db.get_overall_statistics()
+        version = db.get_data_version()
+        bundle = cache.get_analysis_bundle(version)
     except Exception as e:
         st.error(f"Gagal mengambil statistik: {str(e)}")
         return
     
-    _render_metrics(stats_data)
+    _render_metrics(bundle['overall'])
     
     st.divider()
     
-    _render_trend_chart()
+    _render_trend_chart(version, bundle['active_months'])
     
     st.divider()
     
     col_category, col_progress = st.columns([1, 2])
     
     with col_category:
-        _render_category_chart()
+        _render_category_chart(bundle['category_dist'])
     
     with col_progress:
-        _render_project_progress()
+        _render_project_progress(bundle['project_stats'])
 
 
 def _render_metrics(stats_data: dict):
@@ -74,25 +78,13 @@ def _render_metrics(stats_data: dict):
     )
 
 
-def _render_trend_chart():
+def _render_trend_chart(version: tuple, available_months: list):
     st.subheader("Tren Waktu Kerja")
     
-    try:
-        all_activities = db.get_all_activities()
-    except Exception as e:
-        st.error(f"Gagal mengambil data: {str(e)}")
-        return
-    
-    if not all_activities:
+    if not available_months:
         st.info("Belum ada data aktivitas untuk ditampilkan.")
         return
     
-    df = pd.DataFrame(all_activities)
-    df['start_time'] = pd.to_datetime(df['start_time'], format='mixed')
-    
-    df['year_month'] = df['start_time'].dt.to_period('M')
-    available_months = sorted(df['year_month'].unique(), reverse=True)
-    
     nama_bulan = {
         1: 'Januari', 2: 'Februari', 3: 'Maret', 4: 'April',
         5: 'Mei', 6: 'Juni', 7: 'Juli', 8: 'Agustus',
@@ -100,11 +92,10 @@ def _render_trend_chart():
     }
     
     month_options = {}
-    for period in available_months:
-        month_name = nama_bulan[period.month]
-        year = period.year
-        label = f"{month_name} {year}"
-        month_options[label] = period
+    for month in available_months:
+        year, month_num = month.split('-')
+        label = f"{nama_bulan[int(month_num)]} {year}"
+        month_options[label] = month
     
     col_filter, col_spacer = st.columns([1, 3])
     with col_filter:
@@ -114,25 +105,55 @@ def _render_trend_chart():
             index=0
         )
     
-    selected_period = month_options[selected_label]
+    selected_month = month_options[selected_label]
+    
+    # Agregasi per hari dikerjakan SQLite: hanya baris per-hari
+    # (maksimal 31) yang menyeberang ke pandas, bukan seluruh tabel
+    try:
+        daily_hours = cache.get_daily_hours_for_month(version, selected_month)
+        month_summary = cache.get_month_summary(version, selected_month)
+    except Exception as e:
+        st.error(f"Gagal mengambil data: {str(e)}")
+        return
     
-    df_filtered = df[df['year_month'] == selected_period].copy()
+    # Hasil agregasi maksimal 31 baris (HANYA hari yang ada
+    # aktivitas): label tanggal dibangun langsung dari string DATE()
+    # tanpa DataFrame perantara. Figure dibangun lewat builder
+    # ter-cache: rerun dengan data sama tidak membangun ulang plotly.
+    fig = _build_trend_fig(tuple(
+        (date.fromisoformat(row['date']).strftime('%d %b'),
+         row['total_hours'])
+        for row in daily_hours
+    ))
     
-    # Hitung total jam per hari (HANYA hari yang ada aktivitas)
-    df_daily = df_filtered.groupby(df_filtered['start_time'].dt.date)['duration_hours'].sum().reset_index()
-    df_daily.columns = ['date', 'total_hours']
-    df_daily['date'] = pd.to_datetime(df_daily['date'])
-    df_daily = df_daily.sort_values('date')
+    st.plotly_chart(fig, width="stretch")
     
-    # Format tanggal untuk tampilan
-    df_daily['tanggal_format'] = df_daily['date'].dt.strftime('%d %b')
+    _render_month_summary(month_summary)
+
+
+@st.cache_resource(max_entries=32)
+def _build_trend_fig(daily_points: tuple) -> "go.Figure":
+    """
+    Membangun grafik area tren harian (ter-cache per isi data).
+
+    Args:
+        daily_points: Tuple pasangan (label tanggal, total jam)
+
+    Returns:
+        go.Figure: Grafik area hari-hari aktif
+    """
+    # Import lokal: plotly (ratusan ms) tidak ikut dimuat saat cold
+    # start; sys.modules meng-cache-nya setelah pemanggilan pertama
+    import plotly.graph_objects as go
+
+    labels, totals = zip(*daily_points)
     
     # Buat grafik area (hanya hari aktif)
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=df_daily['tanggal_format'],
-        y=df_daily['total_hours'],
+        x=list(labels),
+        y=list(totals),
         mode='lines+markers',
         fill='tozeroy',
         fillcolor='rgba(99, 110, 250, 0.3)',
@@ -155,15 +176,13 @@ def _render_trend_chart():
         showlegend=False
     )
     
-    st.plotly_chart(fig, width="stretch")
-    
-    _render_month_summary(df_filtered, selected_label)
+    return fig
 
 
-def _render_month_summary(df_filtered, month_label):
-    total_hours = df_filtered['duration_hours'].sum() if not df_filtered.empty else 0
-    days_active = df_filtered['start_time'].dt.date.nunique() if not df_filtered.empty else 0
-    total_activities = len(df_filtered)
+def _render_month_summary(month_summary: dict):
+    total_hours = month_summary['total_hours']
+    days_active = month_summary['days_active']
+    total_activities = month_summary['total_activities']
     avg_per_day = total_hours / days_active if days_active > 0 else 0
     
     col1, col2, col3, col4 = st.columns(4)
@@ -181,20 +200,35 @@ def _render_month_summary(df_filtered, month_label):
         st.metric(label="Rata-rata/Hari", value=f"{avg_per_day:.1f} jam")
 
 
-def _render_category_chart():
+def _render_category_chart(cat_data: list):
     st.subheader("Per Kategori")
     
-    try:
-        cat_data = db.get_category_distribution()
-    except Exception as e:
-        st.error(f"Gagal mengambil data: {str(e)}")
-        return
-    
     if not cat_data:
         st.info("Belum ada data.")
         return
     
-    df_cat = pd.DataFrame(cat_data)
+    fig = _build_category_fig(
+        tuple((row['category'], row['total_hours']) for row in cat_data)
+    )
+    
+    st.plotly_chart(fig, width="stretch")
+
+
+@st.cache_resource(max_entries=32)
+def _build_category_fig(category_points: tuple) -> "go.Figure":
+    """
+    Membangun pie chart distribusi kategori (ter-cache per isi data).
+
+    Args:
+        category_points: Tuple pasangan (kategori, total jam)
+
+    Returns:
+        go.Figure: Pie chart donat per kategori
+    """
+    # Import lokal: plotly tidak ikut dimuat saat cold start
+    import plotly.express as px
+
+    df_cat = pd.DataFrame(category_points, columns=['category', 'total_hours'])
     
     fig = px.pie(
         df_cat, 
@@ -213,78 +247,97 @@ def _render_category_chart():
         textinfo='percent+label'
     )
     
-    st.plotly_chart(fig, width="stretch")
+    return fig
 
 
-def _render_project_progress():
+# Warna batang progress per level status; mengikuti palet
+# EFFICIENCY_COLORS agar konsisten dengan halaman Analisis
+_LEVEL_COLORS = {
+    "error": EFFICIENCY_COLORS["critical"],
+    "warning": EFFICIENCY_COLORS["warning"],
+    "success": EFFICIENCY_COLORS["good"],
+    "info": EFFICIENCY_COLORS["excellent"],
+}
+
+
+def _render_project_progress(project_stats: list):
     st.subheader("Progress Proyek")
     
-    try:
-        project_stats = db.get_project_statistics()
-    except Exception as e:
-        st.error(f"Gagal mengambil statistik proyek: {str(e)}")
-        return
-    
     if not project_stats:
         st.info("Belum ada proyek.")
         return
     
-    for project in project_stats:
-        logged_hours = project['total_logged_hours'] or 0
-        estimated_hours = project['estimated_hours'] or 1
-        
-        efficiency = calculate_efficiency(logged_hours, estimated_hours)
-        progress_value = min(max(efficiency / 100, 0.0), 1.0)
-        
-        # Tentukan status dan interpretasi
-        if efficiency < 50:
-            status_text = "Baru Dimulai"
-            sisa = estimated_hours - logged_hours
-            interpretasi = f"Sisa {sisa:.1f} jam lagi"
-        elif efficiency < 80:
-            status_text = "Sedang Berjalan"
-            sisa = estimated_hours - logged_hours
-            interpretasi = f"Sisa {sisa:.1f} jam ({100-efficiency:.0f}%)"
-        elif efficiency < 100:
-            status_text = "Hampir Selesai"
-            sisa = estimated_hours - logged_hours
-            interpretasi = f"Tinggal {sisa:.1f} jam lagi!"
-        elif efficiency == 100:
-            status_text = "Selesai"
-            interpretasi = "Target tercapai!"
+    # Aritmetika dan percabangan status dihitung vektorisasi di muka.
+    # Array kolom dibangun langsung dari baris query, tanpa DataFrame
+    # perantara yang harus menginfer tipe dari list-of-dict.
+    names = [p['name'] for p in project_stats]
+    logged = np.array([p['total_logged_hours'] or 0 for p in project_stats],
+                      dtype=np.float64)
+    estimated = np.array([p['estimated_hours'] or 0 for p in project_stats],
+                         dtype=np.float64)
+    estimated[estimated == 0] = 1.0
+    
+    efficiency = logged / estimated * 100.0
+    progress_values = np.clip(efficiency / 100.0, 0.0, 1.0)
+    sisa = estimated - logged
+    
+    conditions = [
+        efficiency < 50,
+        efficiency < 80,
+        efficiency < 100,
+        efficiency == 100
+    ]
+    status_texts = np.select(conditions, [
+        "Baru Dimulai", "Sedang Berjalan", "Hampir Selesai", "Selesai"
+    ], default="Melebihi Estimasi")
+    levels = np.select(conditions, [
+        "error", "warning", "success", "success"
+    ], default="info")
+    buckets = np.select(conditions, [0, 1, 2, 3], default=4)
+    
+    # Interpretasi butuh format float per baris; angkanya sudah
+    # dihitung vektorisasi di atas
+    interpretations = []
+    for bucket, sisa_val, eff_val in zip(buckets, sisa, efficiency):
+        if bucket == 0:
+            interpretations.append(f"Sisa {sisa_val:.1f} jam lagi")
+        elif bucket == 1:
+            interpretations.append(
+                f"Sisa {sisa_val:.1f} jam ({100 - eff_val:.0f}%)"
+            )
+        elif bucket == 2:
+            interpretations.append(f"Tinggal {sisa_val:.1f} jam lagi!")
+        elif bucket == 3:
+            interpretations.append("Target tercapai!")
         else:
-            status_text = "Melebihi Estimasi"
-            lebih = logged_hours - estimated_hours
-            interpretasi = f"Lebih {lebih:.1f} jam"
-        
-        with st.container():
-            # Baris 1: Nama dan persentase
-            col1, col2 = st.columns([3, 1])
-            
-            with col1:
-                st.write(f"**{project['name']}**")
-            
-            with col2:
-                st.write(f"**{efficiency:.0f}%**")
-            
-            # Baris 2: Progress bar
-            st.progress(progress_value)
-            
-            # Baris 3: Detail dengan status
-            col_detail1, col_detail2 = st.columns(2)
-            
-            with col_detail1:
-                st.caption(f"{format_duration(logged_hours)} / {format_duration(estimated_hours)}")
-            
-            with col_detail2:
-                # Tampilkan status dengan warna
-                if efficiency < 50:
-                    st.error(f"{status_text}: {interpretasi}")
-                elif efficiency < 80:
-                    st.warning(f"{status_text}: {interpretasi}")
-                elif efficiency <= 100:
-                    st.success(f"{status_text}: {interpretasi}")
-                else:
-                    st.info(f"{status_text}: {interpretasi}")
-            
-            st.write("")
+            interpretations.append(f"Lebih {-sisa_val:.1f} jam")
+    
+    # Satu blok HTML untuk semua proyek: widget terpisah per baris
+    # (columns/progress/caption) berarti satu pesan protobuf per widget
+    # ke front-end; satu st.markdown besar cukup satu round-trip
+    blocks = []
+    rows = zip(names, efficiency, progress_values, logged, estimated,
+               status_texts, levels, interpretations)
+    for (name, eff_val, progress_value, logged_hours, estimated_hours,
+            status_text, level, interpretasi) in rows:
+        color = _LEVEL_COLORS[level]
+        # Nama proyek adalah input pengguna: escape agar karakter
+        # HTML tidak merusak markup (apalagi dieksekusi)
+        safe_name = html.escape(name)
+        blocks.append(
+            f'<div style="margin-bottom:1.1rem">'
+            f'<div style="display:flex;justify-content:space-between">'
+            f'<strong>{safe_name}</strong><strong>{eff_val:.0f}%</strong></div>'
+            f'<div style="background:#e9ecef;border-radius:4px;height:10px;'
+            f'margin:4px 0">'
+            f'<div style="background:{color};width:{progress_value * 100:.0f}%;'
+            f'height:100%;border-radius:4px"></div></div>'
+            f'<div style="display:flex;justify-content:space-between;'
+            f'font-size:0.85rem;color:#6c757d">'
+            f'<span>{format_duration(logged_hours)} / '
+            f'{format_duration(estimated_hours)}</span>'
+            f'<span style="color:{color}">{status_text}: {interpretasi}</span>'
+            f'</div></div>'
+        )
+    
+    st.markdown("".join(blocks), unsafe_allow_html=True)
@@ -27,6 +27,11 @@ from constants import (
     ERROR_MESSAGES
 )
 
+# Peta nilai -> posisi untuk selectbox: lookup dict O(1) menggantikan
+# pasangan `in` + .index() yang masing-masing scan linear
+_CATEGORY_INDEX = {category: i for i, category in enumerate(CATEGORIES)}
+_STATUS_INDEX = {status: i for i, status in enumerate(STATUS_OPTIONS)}
+
 
 def render():
     """
@@ -147,18 +152,10 @@ def _render_edit_form():
             help="Estimasi total jam yang dibutuhkan (0.5 - 1000 jam)"
         )
         
-        kategori_index = (
-            CATEGORIES.index(project['category']) 
-            if project['category'] in CATEGORIES 
-            else 0
-        )
+        kategori_index = _CATEGORY_INDEX.get(project['category'], 0)
         kategori = st.selectbox("Kategori *", CATEGORIES, index=kategori_index)
         
-        status_index = (
-            STATUS_OPTIONS.index(project['status']) 
-            if project['status'] in STATUS_OPTIONS 
-            else 0
-        )
+        status_index = _STATUS_INDEX.get(project['status'], 0)
         status = st.selectbox(
             "Status", 
             STATUS_OPTIONS, 
@@ -13,12 +13,184 @@ Program Studi: Teknik Geofisika - Semester 5
 ================================================================================
 """
 
+import csv
+import io
+from contextlib import contextmanager
+
 import streamlit as st
-import pandas as pd
-import os
 
 import database as db
-from constants import DATABASE_FILE, SUCCESS_MESSAGES, ERROR_MESSAGES
+from constants import SUCCESS_MESSAGES, ERROR_MESSAGES
+
+# pyarrow opsional: bila tidak terpasang, halaman tetap berjalan dan
+# hanya menawarkan export CSV
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Teks statis halaman sebagai konstanta modul: satu objek str dipakai
+# ulang di tiap rerun, bukan dialokasikan ulang di dalam fungsi render
+_CSV_CAPTION = (
+    "💡 File CSV dapat dibuka dengan Microsoft Excel, "
+    "Google Sheets, atau aplikasi spreadsheet lainnya."
+)
+
+_DANGER_WARNING = (
+    "**Perhatian!** Tindakan di bawah ini tidak dapat dibatalkan. "
+    "Pastikan Anda sudah mengexport data penting sebelum melanjutkan."
+)
+
+_RESET_WARNING = (
+    "⚠️ **PERINGATAN KERAS!**\n\n"
+    "Anda akan menghapus **SEMUA DATA** termasuk:\n"
+    "- Semua proyek\n"
+    "- Semua catatan aktivitas\n"
+    "- Semua pengaturan\n\n"
+    "Tindakan ini **TIDAK DAPAT DIBATALKAN**!"
+)
+
+
+# ==================== CACHE QUERY HALAMAN PENGATURAN ====================
+# Rerun Streamlit (tiap interaksi widget) mengeksekusi ulang render();
+# wrapper st.cache_data menghindarkan query SQLite berulang selama data
+# tidak berubah. Mutasi (simpan pengaturan / reset) memanggil
+# _invalidate_settings_cache agar hasil lama tidak tersaji.
+
+@contextmanager
+def _report_errors(message: str):
+    """
+    Context manager pelapor error seragam untuk halaman ini.
+
+    Satu tempat untuk bentuk pesan st.error (dan kelak logging),
+    menggantikan blok try/except yang sama di beberapa section.
+
+    Args:
+        message: Awalan pesan yang ditampilkan sebelum detail error
+    """
+    try:
+        yield
+    except Exception as e:
+        st.error(f"{message}: {str(e)}")
+
+
+@st.cache_data(ttl=300)
+def _parsed_settings() -> tuple:
+    """
+    Nilai pengaturan form yang sudah diparse ke float.
+
+    Konversi float + lookup dict cukup sekali per isi cache, bukan
+    pada tiap rerun halaman.
+
+    Returns:
+        tuple: (target_hours_per_day, efficiency_threshold)
+    """
+    settings = db.get_all_settings()
+    return (
+        float(settings.get('target_hours_per_day', 8)),
+        float(settings.get('efficiency_threshold', 0.7)),
+    )
+
+
+@st.cache_data(ttl=300)
+def _activities_csv(version: tuple) -> bytes:
+    """
+    CSV aktivitas ter-encode, ter-cache per token versi data.
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+
+    Returns:
+        bytes: Isi file CSV dalam UTF-8
+    """
+    # csv.writer langsung dari baris sqlite, per potongan fetchmany:
+    # memori puncak tidak memuat seluruh tabel sebagai list baris
+    columns, chunks = db.get_activities_export()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+@st.cache_data(ttl=300)
+def _projects_csv(version: tuple) -> bytes:
+    """
+    CSV proyek ter-encode, ter-cache per token versi data.
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+
+    Returns:
+        bytes: Isi file CSV dalam UTF-8
+    """
+    columns, chunks = db.get_projects_export()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def _parquet_from_export(columns: list, chunks) -> bytes:
+    """
+    Menyusun file Parquet dari kolom dan potongan baris export.
+
+    Args:
+        columns: Nama kolom hasil query
+        chunks: Iterator potongan baris (lihat db.get_*_export)
+
+    Returns:
+        bytes: Isi file Parquet terkompresi zstd
+    """
+    rows = [row for chunk in chunks for row in chunk]
+    if rows:
+        column_data = [list(values) for values in zip(*rows)]
+    else:
+        column_data = [[] for _ in columns]
+
+    table = pa.table(dict(zip(columns, column_data)))
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression='zstd')
+    return buffer.getvalue()
+
+
+@st.cache_data(ttl=300)
+def _activities_parquet(version: tuple) -> bytes:
+    """
+    Parquet aktivitas, ter-cache per token versi data.
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+
+    Returns:
+        bytes: Isi file Parquet
+    """
+    columns, chunks = db.get_activities_export()
+    return _parquet_from_export(columns, chunks)
+
+
+@st.cache_data(ttl=300)
+def _projects_parquet(version: tuple) -> bytes:
+    """
+    Parquet proyek, ter-cache per token versi data.
+
+    Args:
+        version: Token dari db.get_data_version() (key cache)
+
+    Returns:
+        bytes: Isi file Parquet
+    """
+    columns, chunks = db.get_projects_export()
+    return _parquet_from_export(columns, chunks)
+
+
+def _invalidate_settings_cache():
+    """Membersihkan cache halaman setelah mutasi data/pengaturan."""
+    _parsed_settings.clear()
 
 
 def render():
@@ -32,18 +204,11 @@ def render():
     """
     st.header("⚙️ Pengaturan")
     
-    # Ambil settings saat ini
-    try:
-        settings = db.get_all_settings()
-    except Exception as e:
-        st.error(f"Gagal mengambil pengaturan: {str(e)}")
-        settings = {}
-    
     # Layout 2 kolom
     col_settings, col_export = st.columns(2)
     
     with col_settings:
-        _render_settings_form(settings)
+        _render_settings_form()
     
     with col_export:
         _render_export_section()
@@ -54,18 +219,25 @@ def render():
     _render_danger_zone()
 
 
-def _render_settings_form(settings: dict):
+@st.fragment
+def _render_settings_form():
     """
     Merender form pengaturan target dan threshold.
-    
-    Args:
-        settings: Dictionary pengaturan saat ini
+
+    Didekorasi st.fragment: interaksi widget di dalam form hanya
+    mererun fragment ini, bukan seluruh halaman (termasuk section
+    export di kolom sebelah).
     """
     st.subheader("🎯 Target & Threshold")
     
+    # Nilai awal widget dari cache yang sudah diparse; default
+    # dipasang lebih dulu agar tetap terdefinisi saat query gagal
+    current_target, current_threshold = 8.0, 0.7
+    with _report_errors("Gagal mengambil pengaturan"):
+        current_target, current_threshold = _parsed_settings()
+    
     with st.form("settings_form"):
         # Target jam per hari
-        current_target = float(settings.get('target_hours_per_day', 8))
         target_hours = st.number_input(
             "Target Jam Kerja per Hari",
             min_value=1.0,
@@ -76,7 +248,6 @@ def _render_settings_form(settings: dict):
         )
         
         # Threshold efisiensi
-        current_threshold = float(settings.get('efficiency_threshold', 0.7))
         efficiency_threshold = st.slider(
             "Threshold Efisiensi",
             min_value=0.0,
@@ -106,99 +277,102 @@ def _save_settings(target_hours: float, efficiency_threshold: float):
         target_hours: Target jam per hari
         efficiency_threshold: Threshold efisiensi
     """
-    try:
-        db.set_setting('target_hours_per_day', str(target_hours))
-        db.set_setting('efficiency_threshold', str(efficiency_threshold))
+    with _report_errors(f"{ERROR_MESSAGES['database_error']} Detail"):
+        # Satu transaksi (satu fsync) untuk kedua pengaturan
+        db.set_settings_bulk({
+            'target_hours_per_day': str(target_hours),
+            'efficiency_threshold': str(efficiency_threshold),
+        })
+        _invalidate_settings_cache()
         st.success(SUCCESS_MESSAGES['settings_saved'])
-    except Exception as e:
-        st.error(f"{ERROR_MESSAGES['database_error']} Detail: {str(e)}")
 
 
+@st.fragment
 def _render_export_section():
     """
     Merender section untuk export data ke CSV.
+
+    Didekorasi st.fragment agar interaksi di section lain tidak
+    memicu ulang query export.
     """
     st.subheader("📤 Export Data")
     
-    # Export aktivitas
-    try:
-        activities = db.get_all_activities()
-        if activities:
-            df_activities = pd.DataFrame(activities)
-            csv_activities = df_activities.to_csv(index=False)
-            
+    # Export aktivitas: data berupa callable sehingga CSV baru
+    # dibangun saat tombol diklik, bukan pada tiap render; cek kosong
+    # memakai EXISTS, tanpa memuat seluruh tabel
+    with _report_errors("Gagal menyiapkan data aktivitas"):
+        if db.has_activities():
             st.download_button(
                 label="📥 Download Aktivitas (CSV)",
-                data=csv_activities,
+                data=lambda: _activities_csv(db.get_data_version()),
                 file_name="logbook_aktivitas.csv",
                 mime="text/csv",
                 help="Download semua data aktivitas dalam format CSV"
             )
+            if pa is not None:
+                st.download_button(
+                    label="📥 Download Aktivitas (Parquet)",
+                    data=lambda: _activities_parquet(db.get_data_version()),
+                    file_name="logbook_aktivitas.parquet",
+                    mime="application/octet-stream",
+                    help="Format kolumnar terkompresi, lebih kecil dan "
+                         "cepat dibaca pandas/arrow"
+                )
         else:
             st.info("Belum ada data aktivitas untuk di-export.")
-    except Exception as e:
-        st.error(f"Gagal menyiapkan data aktivitas: {str(e)}")
     
     st.write("")  # Spacer
     
     # Export proyek
-    try:
-        projects = db.get_all_projects()
-        if projects:
-            df_projects = pd.DataFrame(projects)
-            csv_projects = df_projects.to_csv(index=False)
-            
+    with _report_errors("Gagal menyiapkan data proyek"):
+        if db.has_projects():
             st.download_button(
                 label="📥 Download Proyek (CSV)",
-                data=csv_projects,
+                data=lambda: _projects_csv(db.get_data_version()),
                 file_name="logbook_proyek.csv",
                 mime="text/csv",
                 help="Download semua data proyek dalam format CSV"
             )
+            if pa is not None:
+                st.download_button(
+                    label="📥 Download Proyek (Parquet)",
+                    data=lambda: _projects_parquet(db.get_data_version()),
+                    file_name="logbook_proyek.parquet",
+                    mime="application/octet-stream",
+                    help="Format kolumnar terkompresi, lebih kecil dan "
+                         "cepat dibaca pandas/arrow"
+                )
         else:
             st.info("Belum ada data proyek untuk di-export.")
-    except Exception as e:
-        st.error(f"Gagal menyiapkan data proyek: {str(e)}")
     
     # Info format
-    st.caption(
-        "💡 File CSV dapat dibuka dengan Microsoft Excel, "
-        "Google Sheets, atau aplikasi spreadsheet lainnya."
-    )
+    st.caption(_CSV_CAPTION)
 
 
+@st.fragment
 def _render_danger_zone():
     """
     Merender danger zone untuk reset database.
+
+    Didekorasi st.fragment: klik tombol reset hanya mererun fragment
+    ini; konfirmasi tampil sebagai modal st.dialog.
     """
     st.subheader("⚠️ Danger Zone")
     
-    st.warning(
-        "**Perhatian!** Tindakan di bawah ini tidak dapat dibatalkan. "
-        "Pastikan Anda sudah mengexport data penting sebelum melanjutkan."
-    )
+    st.warning(_DANGER_WARNING)
     
-    # Tombol reset
+    # Tombol reset membuka modal konfirmasi, tanpa flag session_state
+    # dan tanpa rerun halaman penuh hanya untuk menampilkan konfirmasi
     if st.button("🗑️ Reset Database", type="secondary"):
-        st.session_state['confirm_reset'] = True
-    
-    # Dialog konfirmasi
-    if st.session_state.get('confirm_reset'):
         _render_reset_confirmation()
 
 
+@st.dialog("Konfirmasi Reset Database")
 def _render_reset_confirmation():
     """
-    Merender dialog konfirmasi untuk reset database.
+    Merender modal konfirmasi untuk reset database.
     """
-    st.error(
-        "⚠️ **PERINGATAN KERAS!**\n\n"
-        "Anda akan menghapus **SEMUA DATA** termasuk:\n"
-        "- Semua proyek\n"
-        "- Semua catatan aktivitas\n"
-        "- Semua pengaturan\n\n"
-        "Tindakan ini **TIDAK DAPAT DIBATALKAN**!"
-    )
+    st.error(_RESET_WARNING)
     
     col_confirm, col_cancel = st.columns(2)
     
@@ -208,29 +382,19 @@ def _render_reset_confirmation():
     
     with col_cancel:
         if st.button("❌ Batal"):
-            del st.session_state['confirm_reset']
             st.rerun()
 
 
 def _reset_database():
     """
-    Mereset database dengan menghapus file dan membuat ulang.
+    Mereset database dengan mengosongkan semua tabel.
     """
-    try:
-        # Hapus file database jika ada
-        if os.path.exists(DATABASE_FILE):
-            os.remove(DATABASE_FILE)
-        
-        # Reinisialisasi database
-        db.init_database()
-        
-        # Bersihkan session state
-        if 'confirm_reset' in st.session_state:
-            del st.session_state['confirm_reset']
+    with _report_errors("Gagal mereset database"):
+        # Satu transaksi DELETE lewat koneksi yang sudah terbuka;
+        # tanpa hapus file + pembuatan ulang skema
+        db.reset_all()
+        _invalidate_settings_cache()
         
         st.success(SUCCESS_MESSAGES['database_reset'])
         st.balloons()
         st.rerun()
-        
-    except Exception as e:
-        st.error(f"Gagal mereset database: {str(e)}")